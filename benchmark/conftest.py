@@ -0,0 +1,19 @@
+from pytest import fixture, importorskip
+
+from honeybadgermpc.field import GF
+
+# The fields the benchmarks run on, by name. Those below 2^62 use the
+# NumPy backend. Benchmarks that need other fields than all of them
+# parametrize ``field`` indirectly with a list of names.
+FIELDS = {
+    'bls12_381': 0x73eda753299d7d483339d80809a1d80553bda402fffe5bfeffffffff00000001,
+    'mersenne61': 2**61 - 1,
+    'babybear31': 2013265921,
+}
+
+
+@fixture(params=sorted(FIELDS))
+def field(request):
+    if request.param != 'bls12_381':
+        importorskip('numpy')
+    return GF.get(FIELDS[request.param])
@@ -0,0 +1,124 @@
+import tracemalloc
+from random import randint
+
+from pytest import mark
+
+from honeybadgermpc.field import GF, GFElement
+
+Field = GF.get(0x73eda753299d7d483339d80809a1d80553bda402fffe5bfeffffffff00000001)
+
+
+class DictGFElement(object):
+    """Field element laid out like ``GFElement`` used to be, with a
+    ``__dict__`` holding ``modulus``, ``field`` and ``value``.
+    """
+
+    def __init__(self, value, gf):
+        self.modulus = gf.modulus
+        self.field = gf
+        self.value = value % self.modulus
+
+
+def _bytes_per_element(element_type, k):
+    values = [randint(0, Field.modulus-1) for _ in range(k)]
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        # Buffer the shares like ``PassiveMpc._share_buffers`` does
+        buf = []
+        for v in values:
+            buf.append(element_type(v, Field))
+        used = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    return used / k
+
+
+@mark.parametrize("k", [10000])
+def test_benchmark_buffered_share_memory(benchmark, k):
+    before = _bytes_per_element(DictGFElement, k)
+    after = benchmark.pedantic(_bytes_per_element, args=(GFElement, k), rounds=1)
+    benchmark.extra_info['bytes_per_share_before'] = before
+    benchmark.extra_info['bytes_per_share_after'] = after
+    assert after < before
+
+
+def test_benchmark_element_mul(benchmark):
+    a, b = Field(randint(0, Field.modulus-1)), Field(randint(0, Field.modulus-1))
+    benchmark(lambda: a * b)
+
+
+def test_benchmark_element_add(benchmark):
+    a, b = Field(randint(0, Field.modulus-1)), Field(randint(0, Field.modulus-1))
+    benchmark(lambda: a + b)
+
+
+@mark.parametrize("n", [1000, 10000])
+def test_benchmark_field_array_mul(benchmark, n):
+    a = Field.array([randint(0, Field.modulus-1) for _ in range(n)])
+    b = Field.array([randint(0, Field.modulus-1) for _ in range(n)])
+    benchmark(lambda: a * b)
+
+
+@mark.parametrize("n", [10000])
+def test_benchmark_pack_many(benchmark, n):
+    a = Field.array([randint(0, Field.modulus-1) for _ in range(n)])
+    benchmark(Field.pack_many, a)
+
+
+@mark.parametrize("n", [10000])
+def test_benchmark_unpack_many(benchmark, n):
+    data = Field.pack_many([randint(0, Field.modulus-1) for _ in range(n)])
+    benchmark(Field.unpack_many, data)
+
+
+@mark.parametrize("n", [10000])
+def test_benchmark_pickle_elements(benchmark, n):
+    import pickle
+    elements = [Field(randint(0, Field.modulus-1)) for _ in range(n)]
+    benchmark(lambda: pickle.loads(pickle.dumps(elements)))
+
+
+@mark.parametrize("n", [100, 1000])
+def test_benchmark_dot_eager(benchmark, n):
+    xs = [Field(randint(0, Field.modulus-1)) for _ in range(n)]
+    ys = [Field(randint(0, Field.modulus-1)) for _ in range(n)]
+
+    def _dot():
+        total = Field(0)
+        for x, y in zip(xs, ys):
+            total += x * y
+        return total
+    benchmark(_dot)
+
+
+@mark.parametrize("n", [100, 1000])
+def test_benchmark_dot_lazy(benchmark, n):
+    xs = [Field(randint(0, Field.modulus-1)) for _ in range(n)]
+    ys = [Field(randint(0, Field.modulus-1)) for _ in range(n)]
+    benchmark(Field.dot, xs, ys)
+
+
+@mark.parametrize("n", [10000])
+def test_benchmark_random_batch(benchmark, n):
+    benchmark(Field.random_batch, n)
+
+
+@mark.parametrize("n", [10000])
+def test_benchmark_random_randint(benchmark, n):
+    import random
+    benchmark(lambda: [Field(random.randint(0, Field.modulus-1)) for _ in range(n)])
+
+
+@mark.parametrize("n", [2**12])
+def test_benchmark_omega_powers_pow(benchmark, n):
+    omega = Field.root_of_unity(n)
+    benchmark(lambda: [omega ** j for j in range(n)])
+
+
+@mark.parametrize("n", [2**10])
+def test_benchmark_evaluate_fft(benchmark, n):
+    from honeybadgermpc.polynomial import polynomialsOver
+    poly = polynomialsOver(Field).random(n - 1)
+    omega = Field.root_of_unity(n)
+    benchmark(poly.evaluate_fft, omega, n)
@@ -0,0 +1,36 @@
+from pytest import mark
+
+from honeybadgermpc.polynomial import polynomialsOver
+
+K, N, T = 10000, 16, 5
+
+
+def test_benchmark_share_generation(benchmark, field):
+    Poly = polynomialsOver(field)
+    columns = [field.random_batch(K) for _ in range(T+1)]
+    benchmark(Poly.deal_columns, columns, N)
+
+
+def test_benchmark_share_reconstruction(benchmark, field):
+    Poly = polynomialsOver(field)
+    columns = [field.random_batch(K) for _ in range(T+1)]
+    shares = Poly.deal_columns(columns, N)[:T+1]
+    secrets = benchmark(Poly.interpolate_columns, list(range(1, T+2)), shares)
+    assert secrets == columns[0]
+
+
+@mark.parametrize("field", ['bls12_381'], indirect=True)
+@mark.parametrize("k", [1000])
+def test_benchmark_share_generation_per_element(benchmark, field, k):
+    Poly = polynomialsOver(field)
+    polys = [Poly.random(T) for _ in range(k)]
+    benchmark(lambda: [[poly(x) for poly in polys] for x in range(1, N+1)])
+
+
+@mark.parametrize("field", ['bls12_381'], indirect=True)
+@mark.parametrize("k", [1000])
+def test_benchmark_share_reconstruction_per_element(benchmark, field, k):
+    Poly = polynomialsOver(field)
+    polys = [Poly.random(T) for _ in range(k)]
+    shares = [[(x, poly(x)) for x in range(1, T+2)] for poly in polys]
+    benchmark(lambda: [Poly.interpolate_at(s) for s in shares])
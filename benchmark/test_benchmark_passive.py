@@ -0,0 +1,56 @@
+import asyncio
+
+from pytest import mark
+
+from honeybadgermpc.passive import Field, Poly, runProgramAsTasks
+from honeybadgermpc.preprocessing import deal_preprocessing
+
+
+def _run(program, N, t, preprocessing=None):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(
+            runProgramAsTasks(program, N, t, Field, preprocessing=preprocessing))
+    finally:
+        loop.close()
+
+
+def _open(N, t, k, mode):
+    polys = [Poly.random(t) for _ in range(k)]
+
+    async def _prog(context):
+        shares = [context.Share(poly(context.myid+1)) for poly in polys]
+        if mode == 'array':
+            return await context.ShareArray(shares).open()
+        if mode == 'same_tick':
+            # Independent opens, coalesced into one broadcast
+            return await asyncio.gather(*[share.open() for share in shares])
+        return [await share.open() for share in shares]
+
+    return _run(_prog, N, t)
+
+
+@mark.parametrize("mode", ['sequential', 'same_tick', 'array'])
+@mark.parametrize("N, t, k", [(4, 1, 1000), (16, 5, 1000)])
+def test_benchmark_open(benchmark, N, t, k, mode):
+    benchmark.pedantic(_open, args=(N, t, k, mode), rounds=1)
+
+
+def _multiply(N, t, k, mode):
+    polys = [Poly.random(t) for _ in range(2*k)]
+    stores = deal_preprocessing(Field, N, t, triples=k)
+
+    async def _prog(context):
+        shares = [context.Share(poly(context.myid+1)) for poly in polys]
+        x, y = shares[:k], shares[k:]
+        if mode == 'array':
+            return await (context.ShareArray(x) * context.ShareArray(y))
+        return await asyncio.gather(*[a * b for a, b in zip(x, y)])
+
+    return _run(_prog, N, t, stores)
+
+
+@mark.parametrize("mode", ['shares', 'array'])
+@mark.parametrize("N, t, k", [(4, 1, 1000), (16, 5, 1000)])
+def test_benchmark_beaver_multiply(benchmark, N, t, k, mode):
+    benchmark.pedantic(_multiply, args=(N, t, k, mode), rounds=1)
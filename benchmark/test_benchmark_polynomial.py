@@ -0,0 +1,154 @@
+from pytest import mark
+
+from honeybadgermpc.polynomial import ntt
+
+# The fields with roots of unity of large power-of-two orders
+NTT_FIELDS = ['babybear31', 'bls12_381']
+
+
+@mark.parametrize("field", NTT_FIELDS, indirect=True)
+@mark.parametrize("n", [2**10, 2**12, 2**14, 2**16, 2**18, 2**20])
+def test_benchmark_ntt(benchmark, field, n):
+    values = field.random_batch(n)
+    omega = field.root_of_unity(n)
+    # The twiddle tables are built on the first call and then reused
+    ntt(values, omega, field)
+    benchmark.pedantic(ntt, args=(values, omega, field), rounds=max(1, 2**14 // n))
+
+
+@mark.parametrize("field", NTT_FIELDS, indirect=True)
+@mark.parametrize("n", [2**12])
+def test_benchmark_extrap_odd_full_ntt(benchmark, field, n):
+    from honeybadgermpc.polynomial import polynomialsOver
+    Poly = polynomialsOver(field)
+    values = field.random_batch(n).to_list()
+    omega = field.root_of_unity(2*n)
+
+    def _extrap():
+        # Inverse NTT of size n, then a forward NTT of size 2n
+        poly = Poly.interpolate_fft(values, omega**2)
+        return poly.evaluate_fft(omega, 2*n)[1::2]
+    benchmark(_extrap)
+
+
+@mark.parametrize("field", NTT_FIELDS, indirect=True)
+@mark.parametrize("n", [2**12])
+def test_benchmark_interp_extrap_odd(benchmark, field, n):
+    from honeybadgermpc.polynomial import polynomialsOver
+    values = field.random_batch(n).to_list()
+    omega = field.root_of_unity(2*n)
+    benchmark(polynomialsOver(field).interp_extrap_odd, values, omega)
+
+
+@mark.parametrize("field", ['bls12_381'], indirect=True)
+@mark.parametrize("n", [16, 64])
+def test_benchmark_interpolate_at_cached(benchmark, field, n):
+    from honeybadgermpc.polynomial import polynomialsOver
+    Poly = polynomialsOver(field)
+    shares = [(i, field(i * i)) for i in range(1, n+1)]
+    benchmark(Poly.interpolate_at, shares)
+
+
+@mark.parametrize("field", ['bls12_381'], indirect=True)
+@mark.parametrize("n", [16, 64])
+def test_benchmark_interpolate_at_uncached(benchmark, field, n):
+    from honeybadgermpc.polynomial import _lagrange_weights
+    ys = [field(i * i) for i in range(1, n+1)]
+    xs = frozenset(range(1, n+1))
+
+    def _interpolate():
+        weights = _lagrange_weights.__wrapped__(field, xs, 0)
+        return field.dot(ys, [weights[x] for x in range(1, n+1)])
+    benchmark(_interpolate)
+
+
+@mark.parametrize("field", NTT_FIELDS, indirect=True)
+@mark.parametrize("k, n, t", [(10000, 64, 21)])
+def test_benchmark_deal_columns(benchmark, field, k, n, t):
+    from honeybadgermpc.polynomial import polynomialsOver
+    columns = [field.random_batch(k) for _ in range(t+1)]
+    benchmark.pedantic(polynomialsOver(field).deal_columns, args=(columns, n), rounds=1)
+
+
+@mark.parametrize("field", ['bls12_381'], indirect=True)
+@mark.parametrize("k, n, t", [(1000, 64, 21)])
+def test_benchmark_deal_per_element(benchmark, field, k, n, t):
+    from honeybadgermpc.polynomial import polynomialsOver
+    Poly = polynomialsOver(field)
+    polys = [Poly.random(t) for _ in range(k)]
+    benchmark.pedantic(lambda: [[f(x) for f in polys] for x in range(1, n+1)], rounds=1)
+
+
+@mark.parametrize("field", ['bls12_381'], indirect=True)
+@mark.parametrize("method", ['naive', 'subproduct_tree'])
+@mark.parametrize("n", [64, 256, 1024, 4096])
+def test_benchmark_multipoint_evaluation(benchmark, field, method, n):
+    from honeybadgermpc.polynomial import polynomialsOver
+    poly = polynomialsOver(field).random(n-1)
+    xs = list(range(1, n+1))
+    if method == 'naive':
+        benchmark.pedantic(lambda: [poly(x) for x in xs], rounds=1)
+    else:
+        benchmark.pedantic(poly.evaluate_many, args=(xs,), rounds=1)
+
+
+@mark.parametrize("field", ['bls12_381'], indirect=True)
+@mark.parametrize("method", ['naive', 'subproduct_tree'])
+@mark.parametrize("n", [64, 256, 1024, 4096])
+def test_benchmark_interpolation(benchmark, field, monkeypatch, method, n):
+    import honeybadgermpc.polynomial as polynomial
+    Poly = polynomial.polynomialsOver(field)
+    xs = list(range(1, n+1))
+    ys = field.random_batch(n).values
+    if method == 'naive':
+        # A single leaf: quadratic Lagrange interpolation
+        monkeypatch.setattr(polynomial, 'SUBPRODUCT_LEAF_SIZE', n)
+    benchmark.pedantic(Poly.interpolate, args=(xs, ys), rounds=1)
+
+
+@mark.parametrize("field", NTT_FIELDS, indirect=True)
+@mark.parametrize("algorithm", ['schoolbook', 'karatsuba', 'ntt'])
+@mark.parametrize("n", [16, 64, 256, 1024])
+def test_benchmark_polynomial_mul(benchmark, field, algorithm, n):
+    from honeybadgermpc import polynomial
+    a, b = field.random_batch(n).values, field.random_batch(n).values
+    if algorithm == 'schoolbook':
+        benchmark(polynomial._mul_schoolbook, a, b, field.modulus)
+    elif algorithm == 'karatsuba':
+        benchmark(polynomial._mul_karatsuba, a, b, field.modulus)
+    else:
+        benchmark(polynomial._mul_ntt, a, b, field)
+
+
+@mark.parametrize("field", NTT_FIELDS, indirect=True)
+@mark.parametrize("d", [1100])
+@mark.parametrize("padded", [True, False])
+def test_benchmark_interp_extrap_odd_padding(benchmark, field, d, padded):
+    # Extrapolating d values, padded with zeros to a power of two or not
+    from honeybadgermpc.polynomial import polynomialsOver
+    Poly = polynomialsOver(field)
+    n = 2**(d-1).bit_length()
+    values = field.random_batch(d).to_list()
+    omega = field.root_of_unity(2*n)
+    if padded:
+        values += [field(0)] * (n - d)
+    benchmark(Poly.interp_extrap_odd, values, omega, d)
+
+
+@mark.parametrize("field", NTT_FIELDS, indirect=True)
+@mark.parametrize("k, t", [(10000, 21)])
+@mark.parametrize("mode", ['plain', 'robust', 'decode'])
+def test_benchmark_robust_interpolate_columns(benchmark, field, mode, k, t):
+    # Opening k secrets from 2t+1 shares: plain interpolation, the
+    # optimistic robust path, and the worst case of decoding every secret
+    from honeybadgermpc.polynomial import polynomialsOver
+    Poly = polynomialsOver(field)
+    xs = list(range(1, 2*t+2))
+    columns = Poly.deal_columns([field.random_batch(k) for _ in range(t+1)], 2*t+1)
+    if mode == 'plain':
+        benchmark.pedantic(Poly.interpolate_columns, args=(xs[:t+1], columns[:t+1]),
+                           rounds=1)
+        return
+    if mode == 'decode':
+        columns[0] = columns[0] + 1
+    benchmark.pedantic(Poly.robust_interpolate_columns, args=(xs, columns, t), rounds=1)
@@ -73,16 +73,67 @@ The reason for the slightly confusing error message is that ``x`` and
 ``z`` are instances of two *different* classes called ``GFElement``.
 """
 
+import hashlib
+import operator
+import os
+from collections import OrderedDict
+
 from gmpy import mpz
 
+from .field_backends import select_backend
+
 
 class FieldsNotIdentical(Exception):
     pass
 
 
+def extended_gcd(a, b):
+    """The extended Euclidean algorithm."""
+    x = 0
+    lastx = 1
+    y = 1
+    lasty = 0
+    while b != 0:
+        quotient = a // b
+        a, b = b, a % b
+        x, lastx = lastx - quotient*x, x
+        y, lasty = lasty - quotient*y, y
+    return (lastx, lasty, a)
+
+
+def seeded_rng(seed):
+    """Return a deterministic source of random bytes for ``seed``.
+
+    The result can be passed as the ``rng`` argument of
+    :meth:`GF.random_batch`; it expands the seed with SHAKE-256, one call
+    of the XOF per draw, so that benchmarks and tests can reproduce a run.
+    The seed may be an int, a str or bytes; its type is hashed with it,
+    so ``seeded_rng(7)``, ``seeded_rng('7')`` and ``seeded_rng(b'7')``
+    give different streams.
+    """
+    if isinstance(seed, int):
+        seed = b'int:%d' % seed
+    elif isinstance(seed, str):
+        seed = b'str:' + seed.encode()
+    elif isinstance(seed, (bytes, bytearray)):
+        seed = b'bytes:' + bytes(seed)
+    else:
+        raise TypeError("seed must be an int, str or bytes, not %s"
+                        % type(seed).__name__)
+    counter = [0]
+
+    def _rng(nbytes):
+        block = seed + counter[0].to_bytes(8, 'little')
+        counter[0] += 1
+        return hashlib.shake_256(block).digest(nbytes)
+    return _rng
+
+
 class FieldElement(object):
     """Common base class for elements."""
 
+    __slots__ = ()
+
     def __int__(self):
         """Extract integer value from the field element.
 
@@ -97,12 +148,286 @@ class FieldElement(object):
 class GF(object):
     _field_cache = {}
 
+    # Number of pairs (omega, n) verified as primitive roots of unity that
+    # are remembered per field
+    PRIMITIVE_ROOT_CACHE_SIZE = 32
+
     def __init__(self, modulus):
         self.modulus = modulus
+        # Storage and bulk arithmetic for arrays of elements of this field
+        self.backend = select_backend(modulus)
+        # Size of the canonical fixed-width encoding of an element
+        self.byte_length = (modulus.bit_length() + 7) // 8
+        # Primitive 2^k-th roots of unity, for k = 0 .. two_adicity,
+        # found on first use (see ``root_of_unity``)
+        self._two_adic_roots = None
+        # The pairs (omega, n) known to be primitive roots of unity, least
+        # recently used first
+        self._primitive_roots = OrderedDict()
 
     def __call__(self, value):
         return GFElement(value, self)
 
+    def set_backend(self, name=None):
+        """Switch the backend used by new arrays over this field, by name
+        (see :mod:`honeybadgermpc.field_backends`), or back to the default
+        choice when ``name`` is None. Existing arrays keep their backend.
+        """
+        self.backend = select_backend(self.modulus, name)
+
+    def array(self, values):
+        """Build a :class:`FieldArray` over this field from ``values``."""
+        return FieldArray(self, values)
+
+    @property
+    def two_adicity(self):
+        """The largest s such that 2^s divides p-1, i.e. the largest power
+        of two for which this field has a root of unity.
+        """
+        return ((self.modulus - 1) & (1 - self.modulus)).bit_length() - 1
+
+    def _find_two_adic_roots(self):
+        p = self.modulus
+        s = self.two_adicity
+        root = 1
+        if s > 0:
+            # Raising a quadratic non-residue to the odd part of p-1 gives
+            # a generator of the subgroup of order 2^s.
+            g = 2
+            while pow(g, (p-1) // 2, p) != p-1:
+                g += 1
+            root = pow(g, (p-1) >> s, p)
+        roots = [0] * (s+1)
+        for k in range(s, -1, -1):
+            roots[k] = root
+            root = root * root % p
+        return roots
+
+    def root_of_unity(self, n):
+        """A primitive n-th root of unity, for n a power of two.
+
+        The roots are derived once per field, by repeated squaring of a
+        generator of the largest two-power subgroup, so the same n always
+        gives the same root:
+
+        >>> Zp = GF.get(17)
+        >>> Zp.root_of_unity(4)
+        {13}
+        >>> Zp.root_of_unity(4) ** 2 == Zp.root_of_unity(2)
+        True
+        """
+        if n <= 0 or n & (n-1):
+            raise ValueError("n must be a power of 2, got %d" % n)
+        if self._two_adic_roots is None:
+            self._two_adic_roots = self._find_two_adic_roots()
+        k = n.bit_length() - 1
+        if k >= len(self._two_adic_roots):
+            raise ValueError("field has no root of unity of order %d (two-adicity"
+                             " %d)" % (n, self.two_adicity))
+        return GFElement(self._two_adic_roots[k], self)
+
+    def is_primitive_root_of_unity(self, omega, n):
+        """Test whether ``omega`` is a primitive n-th root of unity, for n
+        a power of two. Positive answers are remembered, so checking the
+        same root again costs a dictionary lookup.
+
+        >>> Zp = GF.get(17)
+        >>> Zp.is_primitive_root_of_unity(Zp(13), 4)
+        True
+        >>> Zp.is_primitive_root_of_unity(Zp(16), 4)
+        False
+        """
+        if type(omega) is GFElement:
+            if omega.field is not self:
+                raise FieldsNotIdentical
+            omega = omega.value
+        key = (omega % self.modulus, n)
+        if key in self._primitive_roots:
+            self._primitive_roots.move_to_end(key)
+            return True
+        p = self.modulus
+        if n == 1:
+            return omega % p == 1
+        # omega has order exactly n iff omega^(n/2) is -1
+        if pow(omega, n // 2, p) != p - 1:
+            return False
+        self._primitive_roots[key] = True
+        if len(self._primitive_roots) > self.PRIMITIVE_ROOT_CACHE_SIZE:
+            self._primitive_roots.popitem(last=False)
+        return True
+
+    def random_batch(self, n, rng=None):
+        """Draw n uniformly random elements, returned as a
+        :class:`FieldArray`.
+
+        Random bytes are read in large blocks from ``rng``, a callable that
+        takes a byte count and returns that many bytes (``os.urandom`` by
+        default, or see :func:`seeded_rng`). Each element is sampled from
+        ``byte_length`` bytes masked to the bit length of the modulus, and
+        rejected if it is not smaller than the modulus.
+        """
+        if rng is None:
+            rng = os.urandom
+        p = self.modulus
+        width = self.byte_length
+        bits = p.bit_length()
+        mask = (1 << bits) - 1
+        values = []
+        while len(values) < n:
+            # Draw enough candidates for the remaining elements given the
+            # expected rejection rate, plus a little slack.
+            missing = n - len(values)
+            count = (missing << bits) // p + 8
+            data = memoryview(rng(count * width))
+            for i in range(0, count * width, width):
+                v = int.from_bytes(data[i:i+width], 'little') & mask
+                if v < p:
+                    values.append(v)
+        del values[n:]
+        return FieldArray._from_ints(self, values)
+
+    def _residues(self, values):
+        """Return the (possibly unreduced) integer residues of a list of
+        elements/ints or of a :class:`FieldArray` over this field.
+        """
+        if isinstance(values, FieldArray):
+            if values.field is not self:
+                raise FieldsNotIdentical
+            return values.values
+        residues = []
+        for v in values:
+            if type(v) is GFElement:
+                if v.field is not self:
+                    raise FieldsNotIdentical
+                v = v.value
+            residues.append(v)
+        return residues
+
+    def accumulator(self):
+        """Start a lazily reduced sum, see :class:`Accumulator`."""
+        return Accumulator(self)
+
+    def dot(self, xs, ys):
+        """Inner product of two equally long sequences of elements (or
+        ints, or :class:`FieldArray`), reduced once at the end.
+
+        >>> Zp = GF.get(19)
+        >>> Zp.dot([Zp(2), Zp(3)], Zp.array([10, 11]))
+        {15}
+        """
+        if isinstance(xs, FieldArray) and isinstance(ys, FieldArray):
+            return GFElement(xs._backend.dot(xs._store, xs._operand(ys)), self)
+        xs, ys = self._residues(xs), self._residues(ys)
+        if len(xs) != len(ys):
+            raise ValueError("length mismatch: %d != %d" % (len(xs), len(ys)))
+        return GFElement(sum(map(operator.mul, xs, ys)), self)
+
+    def linear_combination(self, coeffs, arrays):
+        """Sum of ``coeffs[i] * arrays[i]`` for equally long
+        :class:`FieldArray` over this field, computed entry-wise in one
+        pass over the backend stores.
+
+        >>> Zp = GF.get(19)
+        >>> Zp.linear_combination([2, Zp(3)], [Zp.array([1, 2]), Zp.array([5, 7])])
+        FieldArray([17, 6])
+        """
+        if len(coeffs) != len(arrays):
+            raise ValueError("length mismatch: %d != %d" % (len(coeffs), len(arrays)))
+        if not arrays:
+            raise ValueError("linear_combination() requires at least one array")
+        if not all(isinstance(a, FieldArray) for a in arrays):
+            raise TypeError("linear_combination() requires FieldArray operands")
+        first = arrays[0]
+        if first.field is not self:
+            raise FieldsNotIdentical
+        stores = [first._operand(a) for a in arrays]
+        scalars = [first._operand(c) for c in coeffs]
+        if any(type(c) is not int for c in scalars):
+            raise TypeError("coefficients must be field elements or ints")
+        return first._new(first._backend.combine(stores, scalars))
+
+    def batch_inverse(self, values):
+        """Invert every element of ``values`` at once.
+
+        Uses Montgomery's trick: a single extended Euclid inversion of the
+        product of all the values, plus 3(n-1) multiplications to peel the
+        individual inverses off it.
+
+        >>> Zp = GF.get(19)
+        >>> Zp.batch_inverse([Zp(2), Zp(3), 5])
+        [{10}, {13}, {4}]
+
+        A :class:`FieldArray` argument gives a :class:`FieldArray` result.
+        Like single inversion, a zero anywhere in ``values`` raises a
+        ZeroDivisionError.
+        """
+        p = self.modulus
+        xs = [v % p for v in self._residues(values)]
+        n = len(xs)
+        if n == 0:
+            if isinstance(values, FieldArray):
+                return FieldArray._from_ints(self, [])
+            return []
+
+        # prefix[i] is the product of xs[:i]
+        prefix = [1] * n
+        acc = xs[0]
+        for i in range(1, n):
+            prefix[i] = acc
+            acc = acc * xs[i] % p
+        if acc == 0:
+            raise ZeroDivisionError("Cannot invert zero")
+
+        inv = extended_gcd(acc, p)[0] % p
+        inverses = [0] * n
+        for i in range(n-1, 0, -1):
+            inverses[i] = inv * prefix[i] % p
+            inv = inv * xs[i] % p
+        inverses[0] = inv
+
+        if isinstance(values, FieldArray):
+            return FieldArray._from_ints(self, inverses)
+        return [GFElement(v, self) for v in inverses]
+
+    def from_bytes(self, data):
+        """Decode an element from its canonical encoding.
+
+        >>> Zp = GF.get(19)
+        >>> Zp.from_bytes(Zp(13).to_bytes())
+        {13}
+        """
+        if len(data) != self.byte_length:
+            raise ValueError("expected %d bytes, got %d" % (
+                self.byte_length, len(data)))
+        value = int.from_bytes(data, 'little')
+        if value >= self.modulus:
+            raise ValueError("non-canonical encoding of a field element")
+        return GFElement(value, self)
+
+    def pack_many(self, values):
+        """Encode a list of elements or a :class:`FieldArray` into one
+        contiguous ``bytes`` object, ``byte_length`` bytes per element.
+
+        >>> Zp = GF.get(509)
+        >>> Zp.pack_many([Zp(1), 258])
+        b'\\x01\\x00\\x02\\x01'
+        """
+        p = self.modulus
+        xs = [v % p for v in self._residues(values)]
+        width = self.byte_length
+        return b''.join([v.to_bytes(width, 'little') for v in xs])
+
+    def unpack_many(self, data):
+        """Decode the output of :meth:`pack_many` (any bytes-like object)
+        into a :class:`FieldArray`, reading the buffer in place.
+        """
+        view = memoryview(data).cast('B')
+        width = self.byte_length
+        if len(view) % width:
+            raise ValueError("buffer length %d is not a multiple of %d" % (
+                len(view), width))
+        return FieldArray._wrap(self, self.backend.from_bytes(view, width))
+
     def __reduce__(self):
         return (GF.get, (self.modulus,))
 
@@ -120,38 +445,47 @@ class GF(object):
 
 
 class GFElement(FieldElement):
+    """An element of a :class:`GF`.
+
+    Elements only hold their reduced value and a reference to their field;
+    the modulus is read from the field, so that large batches of shares
+    do not each carry their own copy of it.
+    """
+
+    __slots__ = ('value', 'field')
 
     def __init__(self, value, gf):
-        self.modulus = gf.modulus
         self.field = gf
-        self.value = value % self.modulus
+        self.value = value % gf.modulus
+
+    @property
+    def modulus(self):
+        return self.field.modulus
 
     def __add__(self, other):
         """Addition."""
-        if not isinstance(other, (GFElement, int)):
-            return NotImplemented
-        try:
+        if type(other) is GFElement:
             # We can do a quick test using 'is' here since
             # there will only be one class representing this
             # field.
             if self.field is not other.field:
                 raise FieldsNotIdentical
             return GFElement(self.value + other.value, self.field)
-        except AttributeError:
+        if isinstance(other, int):
             return GFElement(self.value + other, self.field)
+        return NotImplemented
 
     __radd__ = __add__
 
     def __sub__(self, other):
         """Subtraction."""
-        if not isinstance(other, (GFElement, int)):
-            return NotImplemented
-        try:
+        if type(other) is GFElement:
             if self.field is not other.field:
                 raise FieldsNotIdentical
             return GFElement(self.value - other.value, self.field)
-        except AttributeError:
+        if isinstance(other, int):
             return GFElement(self.value - other, self.field)
+        return NotImplemented
 
     def __rsub__(self, other):
         """Subtraction (reflected argument version)."""
@@ -159,14 +493,13 @@ class GFElement(FieldElement):
 
     def __xor__(self, other):
         """Xor for bitvalues."""
-        if not isinstance(other, (GFElement, int)):
-            return NotImplemented
-        try:
+        if type(other) is GFElement:
             if self.field is not other.field:
                 raise FieldsNotIdentical
             return GFElement(self.value ^ other.value, self.field)
-        except AttributeError:
+        if isinstance(other, int):
             return GFElement(self.value ^ other, self.field)
+        return NotImplemented
 
     def __rxor__(self, other):
         """Xor for bitvalues (reflected argument version)."""
@@ -174,20 +507,19 @@ class GFElement(FieldElement):
 
     def __mul__(self, other):
         """Multiplication."""
-        if not isinstance(other, (GFElement, int)):
-            return NotImplemented
-        try:
+        if type(other) is GFElement:
             if self.field is not other.field:
                 raise FieldsNotIdentical
             return GFElement(self.value * other.value, self.field)
-        except AttributeError:
+        if isinstance(other, int):
             return GFElement(self.value * other, self.field)
+        return NotImplemented
 
     __rmul__ = __mul__
 
     def __pow__(self, exponent):
         """Exponentiation."""
-        return GFElement(pow(self.value, exponent, self.modulus), self.field)
+        return GFElement(pow(self.value, exponent, self.field.modulus), self.field)
 
     def __neg__(self):
         """Negation."""
@@ -201,31 +533,16 @@ class GFElement(FieldElement):
         """
         if self.value == 0:
             raise ZeroDivisionError("Cannot invert zero")
-
-        def extended_gcd(a, b):
-            """The extended Euclidean algorithm."""
-            x = 0
-            lastx = 1
-            y = 1
-            lasty = 0
-            while b != 0:
-                quotient = a // b
-                a, b = b, a % b
-                x, lastx = lastx - quotient*x, x
-                y, lasty = lasty - quotient*y, y
-            return (lastx, lasty, a)
-
         inverse = extended_gcd(self.value, self.modulus)[0]
         return GFElement(inverse, self.field)
 
     def __div__(self, other):
         """Division."""
-        try:
+        if type(other) is GFElement:
             if self.field is not other.field:
                 raise FieldsNotIdentical
             return self * ~other
-        except AttributeError:
-            return self * ~GFElement(other, self.field)
+        return self * ~GFElement(other, self.field)
 
     __truediv__ = __div__
     __floordiv__ = __div__
@@ -254,6 +571,13 @@ class GFElement(FieldElement):
         root = pow(self.value, (self.modulus+1)//4, self.modulus)
         return GFElement(root, self.field)
 
+    def to_bytes(self):
+        """Canonical encoding: ``field.byte_length`` bytes, little-endian.
+
+        For the BLS12-381 scalar field this is 32 bytes.
+        """
+        return self.value.to_bytes(self.field.byte_length, 'little')
+
     def bit(self, index):
         """Extract a bit (index is counted from zero)."""
         return (self.value >> index) & 1
@@ -285,21 +609,19 @@ class GFElement(FieldElement):
 
     def __eq__(self, other):
         """Equality test."""
-        try:
+        if type(other) is GFElement:
             if self.field is not other.field:
                 raise FieldsNotIdentical
             return self.value == other.value
-        except AttributeError:
-            return self.value == other
+        return self.value == other
 
     def __ne__(self, other):
         """Inequality test."""
-        try:
+        if type(other) is GFElement:
             if self.field is not other.field:
                 raise FieldsNotIdentical
             return self.value != other.value
-        except AttributeError:
-            return self.value != other
+        return self.value != other
 
     def __cmp__(self, other):
         """Comparison."""
@@ -336,6 +658,267 @@ class GFElement(FieldElement):
         return self.value != 0
 
 
+class FieldArray(object):
+    """A vector of elements of a single field.
+
+    The residues are kept in one backing list of integers rather than as
+    individual :class:`GFElement` objects, so element-wise arithmetic on
+    a whole batch of shares costs one reduction per entry and no
+    per-entry field checks:
+
+    >>> Zp = GF.get(19)
+    >>> a = Zp.array([1, 2, 3])
+    >>> b = Zp.array([10, 11, 12])
+    >>> a + b
+    FieldArray([11, 13, 15])
+    >>> a * b
+    FieldArray([10, 3, 17])
+
+    Scalars (field elements or integers) are broadcast:
+
+    >>> a * Zp(2)
+    FieldArray([2, 4, 6])
+    >>> 1 - a
+    FieldArray([0, 18, 17])
+
+    Indexing returns a field element, slicing returns a new array:
+
+    >>> a[0]
+    {1}
+    >>> a[::2]
+    FieldArray([1, 3])
+
+    Reductions reduce modulo the field order only once:
+
+    >>> a.sum()
+    {6}
+    >>> a.dot(b)
+    {11}
+
+    The backing store is chosen by the field's backend (see
+    :mod:`honeybadgermpc.field_backends`): a list of Python ints in
+    general, or a NumPy array for small primes. An array keeps the
+    backend it was created with, so that :meth:`GF.set_backend` only
+    affects arrays created afterwards.
+    """
+
+    __slots__ = ('field', '_backend', '_store')
+
+    def __init__(self, field, values):
+        modulus = field.modulus
+        residues = []
+        for v in values:
+            if type(v) is GFElement:
+                if v.field is not field:
+                    raise FieldsNotIdentical
+                residues.append(v.value)
+            else:
+                # Only integers are accepted, floats are not truncated
+                residues.append(operator.index(v) % modulus)
+        self.field = field
+        self._backend = field.backend
+        self._store = self._backend.from_ints(residues)
+
+    @classmethod
+    def _wrap(cls, field, store, backend=None):
+        # Build an array around a backend store, without copying or
+        # checking it.
+        array = object.__new__(cls)
+        array.field = field
+        array._backend = field.backend if backend is None else backend
+        array._store = store
+        return array
+
+    @classmethod
+    def _from_ints(cls, field, values):
+        # Build an array from a list of already reduced integers.
+        return cls._wrap(field, field.backend.from_ints(values))
+
+    def _new(self, store):
+        return FieldArray._wrap(self.field, store, self._backend)
+
+    @property
+    def values(self):
+        """The residues as a new list of ints."""
+        return self._backend.to_ints(self._store)
+
+    def _operand(self, other):
+        """Return the store of ``other`` (for another array of the same
+        length) or its residue as an int (for a broadcast scalar).
+        """
+        if isinstance(other, FieldArray):
+            if self.field is not other.field:
+                raise FieldsNotIdentical
+            if len(self) != len(other):
+                raise ValueError("length mismatch: %d != %d" % (len(self), len(other)))
+            if other._backend is not self._backend:
+                return self._backend.from_ints(other.values)
+            return other._store
+        if isinstance(other, GFElement):
+            if self.field is not other.field:
+                raise FieldsNotIdentical
+            return other.value
+        if isinstance(other, int):
+            return other % self.field.modulus
+        return NotImplemented
+
+    def __len__(self):
+        return self._backend.length(self._store)
+
+    def __iter__(self):
+        field = self.field
+        for v in self.values:
+            yield GFElement(v, field)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._new(self._backend.take(self._store, index))
+        return GFElement(self._backend.item(self._store, index), self.field)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            if not isinstance(value, FieldArray):
+                value = FieldArray(self.field, value)
+            elif value.field is not self.field:
+                raise FieldsNotIdentical
+            store = value._store
+            if value._backend is not self._backend:
+                store = self._backend.from_ints(value.values)
+            self._backend.assign(self._store, index, store)
+            return
+        if isinstance(value, GFElement) and value.field is not self.field:
+            raise FieldsNotIdentical
+        self._backend.assign(self._store, index, int(value) % self.field.modulus)
+
+    def __add__(self, other):
+        """Element-wise addition."""
+        y = self._operand(other)
+        if y is NotImplemented:
+            return y
+        return self._new(self._backend.add(self._store, y))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        """Element-wise subtraction."""
+        y = self._operand(other)
+        if y is NotImplemented:
+            return y
+        return self._new(self._backend.sub(self._store, y))
+
+    def __rsub__(self, other):
+        """Element-wise subtraction (reflected argument version)."""
+        y = self._operand(other)
+        if y is NotImplemented:
+            return y
+        return self._new(self._backend.rsub(self._store, y))
+
+    def __mul__(self, other):
+        """Element-wise multiplication."""
+        y = self._operand(other)
+        if y is NotImplemented:
+            return y
+        return self._new(self._backend.mul(self._store, y))
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        """Element-wise negation."""
+        return self._new(self._backend.neg(self._store))
+
+    def __pow__(self, exponent):
+        """Element-wise exponentiation by an integer exponent. Negative
+        exponents invert every entry first, and so raise a
+        ZeroDivisionError on a zero entry.
+        """
+        if exponent < 0:
+            return self.field.batch_inverse(self) ** -exponent
+        return self._new(self._backend.pow(self._store, exponent))
+
+    def sum(self):
+        """Sum of all entries."""
+        return GFElement(self._backend.sum(self._store), self.field)
+
+    def dot(self, other):
+        """Inner product with another array of the same field and length."""
+        if not isinstance(other, FieldArray):
+            raise TypeError("dot() requires a FieldArray operand")
+        return self.field.dot(self, other)
+
+    def copy(self):
+        return self._new(self._backend.copy(self._store))
+
+    def to_list(self):
+        """Convert to a list of :class:`GFElement`."""
+        return list(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, FieldArray):
+            return NotImplemented
+        if self.field is not other.field or len(self) != len(other):
+            return False
+        return self._backend.equal(self._store, self._operand(other))
+
+    def __ne__(self, other):
+        if not isinstance(other, FieldArray):
+            return NotImplemented
+        return not self == other
+
+    # Arrays are mutable
+    __hash__ = None
+
+    def __repr__(self):
+        return "FieldArray(%r)" % (self.values,)
+
+
+class Accumulator(object):
+    """Sum of field elements and products of field elements, kept as a raw
+    integer and reduced modulo the field order only when read.
+
+    A linear combination of n terms then costs n integer multiplications
+    and additions plus a single reduction, instead of n reductions of
+    double-width products:
+
+    >>> Zp = GF.get(19)
+    >>> acc = Zp.accumulator()
+    >>> acc.add(Zp(7))
+    >>> acc.add_product(Zp(10), Zp(15))
+    >>> acc.add_dot([Zp(2), Zp(3)], [4, 5])
+    >>> acc.value()
+    {9}
+    """
+
+    __slots__ = ('field', 'total')
+
+    def __init__(self, field):
+        self.field = field
+        self.total = 0
+
+    def _residue(self, x):
+        if type(x) is GFElement:
+            if x.field is not self.field:
+                raise FieldsNotIdentical
+            return x.value
+        return x
+
+    def add(self, x):
+        self.total += self._residue(x)
+
+    def add_product(self, x, y):
+        self.total += self._residue(x) * self._residue(y)
+
+    def add_dot(self, xs, ys):
+        xs, ys = self.field._residues(xs), self.field._residues(ys)
+        if len(xs) != len(ys):
+            raise ValueError("length mismatch: %d != %d" % (len(xs), len(ys)))
+        self.total += sum(map(operator.mul, xs, ys))
+
+    def value(self):
+        """Return the accumulated sum as a field element."""
+        self.total %= self.field.modulus
+        return GFElement(self.total, self.field)
+
+
 def FakeGF(modulus):
     """Construct a fake field.
 
@@ -0,0 +1,310 @@
+"""Storage and bulk arithmetic backends for :class:`~honeybadgermpc.field.FieldArray`.
+
+A backend owns the representation of a batch of residues (its *store*)
+and implements element-wise arithmetic on it. Each :class:`GF` picks one
+backend when it is created, see :func:`select_backend`:
+
+- :class:`IntListBackend` keeps a Python list of ints and works for any
+  modulus.
+- :class:`NumpyUint64Backend` keeps a NumPy ``uint64`` array and is used
+  for primes below 2^62 when NumPy is installed. Products are reduced
+  with a direct ``%`` below 2^32 and with vectorized Montgomery
+  reduction above.
+
+There is no vectorized backend for larger moduli such as the 255-bit
+BLS12-381 scalar field. NumPy has no 128-bit lanes, so products must
+be split into 16-bit limbs, which takes about 500 limb multiplications
+per element for a Montgomery product. A backend doing this was slower
+than :class:`IntListBackend` at every batch size measured, so those
+fields use the list of ints.
+
+Stores always hold a canonical (fully reduced) representation, so they
+can be compared directly. Scalars passed to the arithmetic methods are
+reduced Python ints. ``from_bytes`` decodes the fixed-width
+little-endian encoding of :meth:`GF.pack_many` into a store.
+"""
+import operator
+
+try:
+    import numpy as np
+except ImportError:     # pragma: no cover
+    np = None
+
+
+def window_pow(backend, a, one, exponent):
+    """Raise every entry of the store ``a`` to ``exponent`` with the
+    fixed-window method, given the store ``one`` of ones of the same
+    shape.
+
+    Large exponents (such as p-2 or (p+1)/4) are consumed four bits at a
+    time from a table of a^0 .. a^15, which takes about a quarter of the
+    multiplications of square-and-multiply on top of the squarings.
+    """
+    if exponent < 0:
+        raise ValueError("negative exponents are not supported")
+    window = 4 if exponent.bit_length() > 16 else 1
+    mask = (1 << window) - 1
+    digits = []
+    while exponent:
+        digits.append(exponent & mask)
+        exponent >>= window
+    if not digits:
+        return one
+    table = [one, a]
+    for _ in range(2, mask + 1):
+        table.append(backend.mul(table[-1], a))
+    result = backend.copy(table[digits.pop()])
+    for digit in reversed(digits):
+        for _ in range(window):
+            result = backend.mul(result, result)
+        if digit:
+            result = backend.mul(result, table[digit])
+    return result
+
+
+def combine(backend, stores, scalars):
+    """Compute sum(scalars[i] * stores[i]) with the arithmetic of
+    ``backend``, one scaled store at a time.
+    """
+    acc = backend.mul(stores[0], scalars[0])
+    for store, scalar in zip(stores[1:], scalars[1:]):
+        acc = backend.add(acc, backend.mul(store, scalar))
+    return acc
+
+
+class IntListBackend(object):
+    """Residues as a list of Python ints."""
+
+    name = 'int'
+
+    def __init__(self, modulus):
+        self.modulus = modulus
+
+    def from_ints(self, values):
+        return list(values)
+
+    def to_ints(self, store):
+        return list(store)
+
+    def from_bytes(self, view, width):
+        values = [int.from_bytes(view[i:i+width], 'little')
+                  for i in range(0, len(view), width)]
+        if any(v >= self.modulus for v in values):
+            raise ValueError("non-canonical encoding of a field element")
+        return values
+
+    def length(self, store):
+        return len(store)
+
+    def copy(self, store):
+        return list(store)
+
+    def take(self, store, index):
+        return store[index]
+
+    def item(self, store, index):
+        return store[index]
+
+    def assign(self, store, index, value):
+        store[index] = value
+
+    def equal(self, a, b):
+        return a == b
+
+    def add(self, a, b):
+        p = self.modulus
+        if isinstance(b, int):
+            return [(x + b) % p for x in a]
+        return [(x + y) % p for x, y in zip(a, b)]
+
+    def sub(self, a, b):
+        p = self.modulus
+        if isinstance(b, int):
+            return [(x - b) % p for x in a]
+        return [(x - y) % p for x, y in zip(a, b)]
+
+    def rsub(self, a, b):
+        p = self.modulus
+        return [(b - x) % p for x in a]
+
+    def mul(self, a, b):
+        p = self.modulus
+        if isinstance(b, int):
+            return [x * b % p for x in a]
+        return [x * y % p for x, y in zip(a, b)]
+
+    def neg(self, a):
+        p = self.modulus
+        return [-x % p for x in a]
+
+    def pow(self, a, exponent):
+        if exponent < 0:
+            raise ValueError("negative exponents are not supported")
+        p = self.modulus
+        return [pow(x, exponent, p) for x in a]
+
+    def sum(self, a):
+        return sum(a) % self.modulus
+
+    def dot(self, a, b):
+        return sum(map(operator.mul, a, b)) % self.modulus
+
+    def combine(self, stores, scalars):
+        # Each entry is reduced once, after summing its unreduced products
+        p = self.modulus
+        return [sum(map(operator.mul, column, scalars)) % p for column in zip(*stores)]
+
+
+class NumpyUint64Backend(object):
+    """Residues as a NumPy ``uint64`` array, for moduli below 2^62.
+
+    Below 2^32 a product of two residues fits in 64 bits and is reduced
+    with ``%``. Above, the 128-bit product is formed from 32-bit halves
+    and reduced with Montgomery's REDC for R = 2^64. Two REDC passes (the
+    second one multiplying by R^2 mod p) give a*b mod p, so that stores
+    keep the plain residues rather than Montgomery forms.
+    """
+
+    name = 'numpy'
+
+    MAX_MODULUS_BITS = 62
+
+    def __init__(self, modulus):
+        assert np is not None, "NumPy is required for the uint64 backend"
+        assert modulus.bit_length() <= self.MAX_MODULUS_BITS
+        self.modulus = modulus
+        self.p = np.uint64(modulus)
+        self.small = modulus < 2**32
+        if not self.small:
+            # Montgomery constants for R = 2^64: -p^-1 mod R and R^2 mod p.
+            # Each Newton step doubles the number of correct low bits of
+            # the inverse, starting from p^-1 = p mod 8.
+            inv = modulus
+            for _ in range(5):
+                inv = inv * (2 - modulus * inv) % 2**64
+            self.pinv = np.uint64(-inv % 2**64)
+            self.r2 = np.uint64(pow(2, 128, modulus))
+        self._mask32 = np.uint64(0xffffffff)
+        self._shift32 = np.uint64(32)
+
+    def from_ints(self, values):
+        return np.array(values, dtype=np.uint64)
+
+    def to_ints(self, store):
+        return store.tolist()
+
+    def from_bytes(self, view, width):
+        if width in (1, 2, 4, 8):
+            store = np.frombuffer(view, dtype='<u%d' % width).astype(np.uint64)
+        else:
+            # Widen each element to 8 bytes, and read them as one array
+            raw = np.frombuffer(view, dtype=np.uint8).reshape(-1, width)
+            padded = np.zeros((len(raw), 8), dtype=np.uint8)
+            padded[:, :width] = raw
+            store = padded.view('<u8').ravel().astype(np.uint64)
+        if (store >= self.p).any():
+            raise ValueError("non-canonical encoding of a field element")
+        return store
+
+    def length(self, store):
+        return len(store)
+
+    def copy(self, store):
+        return store.copy()
+
+    def take(self, store, index):
+        return store[index].copy()
+
+    def item(self, store, index):
+        return int(store[index])
+
+    def assign(self, store, index, value):
+        store[index] = value
+
+    def equal(self, a, b):
+        return a.shape == b.shape and bool((a == b).all())
+
+    def _scalar(self, b):
+        return np.uint64(b) if isinstance(b, int) else b
+
+    def add(self, a, b):
+        s = a + self._scalar(b)
+        return np.where(s >= self.p, s - self.p, s)
+
+    def sub(self, a, b):
+        b = self._scalar(b)
+        return np.where(a >= b, a - b, a + (self.p - b))
+
+    def rsub(self, a, b):
+        return self.sub(np.full_like(a, b), a)
+
+    def neg(self, a):
+        return np.where(a == 0, a, self.p - a)
+
+    def _mul_wide(self, a, b):
+        """128-bit products of a and b, as (high, low) 64-bit words."""
+        m32, s32 = self._mask32, self._shift32
+        a0, a1 = a & m32, a >> s32
+        b0, b1 = b & m32, b >> s32
+        p00, p01, p10, p11 = a0 * b0, a0 * b1, a1 * b0, a1 * b1
+        mid = (p00 >> s32) + (p01 & m32) + (p10 & m32)
+        lo = (mid << s32) | (p00 & m32)
+        hi = p11 + (p01 >> s32) + (p10 >> s32) + (mid >> s32)
+        return hi, lo
+
+    def _redc(self, hi, lo):
+        """Montgomery reduction of hi*2^64 + lo, for hi < p."""
+        m = lo * self.pinv
+        mp_hi, _ = self._mul_wide(m, self.p)
+        # lo + low(m*p) is 0 mod 2^64; it carries into the high word
+        # unless lo is 0.
+        t = hi + mp_hi + (lo != 0).astype(np.uint64)
+        return np.where(t >= self.p, t - self.p, t)
+
+    def mul(self, a, b):
+        if self.small:
+            return a * self._scalar(b) % self.p
+        if isinstance(b, int):
+            # A scalar can be put in Montgomery form up front, which saves
+            # the second reduction.
+            return self._redc(*self._mul_wide(a, np.uint64((b << 64) % self.modulus)))
+        ab = self._redc(*self._mul_wide(a, b))
+        return self._redc(*self._mul_wide(ab, self.r2))
+
+    def pow(self, a, exponent):
+        return window_pow(self, a, np.ones_like(a), exponent)
+
+    def _sum_words(self, a):
+        # Sum the 32-bit halves separately, so that the sums cannot
+        # overflow for fewer than 2^32 terms.
+        hi = int((a >> self._shift32).sum(dtype=np.uint64))
+        lo = int((a & self._mask32).sum(dtype=np.uint64))
+        return ((hi << 32) + lo) % self.modulus
+
+    def sum(self, a):
+        return self._sum_words(a)
+
+    def dot(self, a, b):
+        return self._sum_words(self.mul(a, b))
+
+    def combine(self, stores, scalars):
+        return combine(self, stores, scalars)
+
+
+BACKENDS = {
+    IntListBackend.name: IntListBackend,
+    NumpyUint64Backend.name: NumpyUint64Backend,
+}
+
+
+def select_backend(modulus, name=None):
+    """Instantiate the backend called ``name`` for fields of this modulus,
+    or by default pick the fastest available one.
+    """
+    if name is not None:
+        if name not in BACKENDS:
+            raise ValueError("unknown field backend %r" % (name,))
+        return BACKENDS[name](modulus)
+    if np is not None and modulus.bit_length() <= NumpyUint64Backend.MAX_MODULUS_BITS:
+        return NumpyUint64Backend(modulus)
+    return IntListBackend(modulus)
@@ -1,27 +1,62 @@
 import asyncio
 from asyncio import Future
-from .field import GF, GFElement
-from .polynomial import polynomialsOver
+from bisect import bisect_right
+from collections import deque
+from .field import GF, GFElement, FieldArray
+from .polynomial import polynomialsOver, parity_check_vector, DecodingError
+from .preprocessing import PreprocessingStore, read_share_values
 from .router import simple_router
-import random
 
 
 class NotEnoughShares(Exception):
     pass
 
 
+class _Batch(object):
+    # Share ids start..end-1 opened together, with a (first shareid,
+    # last shareid + 1, future) per open, and the number of parties
+    # that sent all their shares of the batch
+    __slots__ = ('start', 'end', 'openings', 'received')
+
+    def __init__(self, start, end, openings):
+        self.start = start
+        self.end = end
+        self.openings = openings
+        self.received = 0
+
+
 class PassiveMpc(object):
 
-    def __init__(self, sid, N, t, myid, send, recv, prog):
+    def __init__(self, sid, N, t, myid, send, recv, prog, field=None, robust=False,
+                 max_inflight=None, preprocessing=None):
         # Parameters for passive secure MPC
         # Note: tolerates min(t,N-t) crash faults
+        # In robust mode, openings also tolerate up to t wrong shares,
+        # provided N >= 3t+1
+        # With max_inflight, opens are held back while more shares than
+        # that are opened but not reconstructed yet
         assert type(N) is int and type(t) is int
         assert t < N
+        assert not robust or N >= 3*t + 1, "robust mode needs N >= 3t+1"
         self.sid = sid
         self.N = N
         self.t = t
         self.myid = myid
 
+        # Field the shares live in, by default the BLS12-381 scalar field
+        self.field = Field if field is None else field
+        self.Poly = polynomialsOver(self.field)
+
+        # Triples, random shares and zero shares of this party, used by
+        # the multiplications of shares
+        if preprocessing is None:
+            preprocessing = PreprocessingStore(self.field)
+        self.preprocessing = preprocessing
+
+        # Robust openings wait for 2t+1 shares and check they lie on one
+        # polynomial of degree t, decoding them otherwise.
+        self.robust = robust
+
         # send(j, o): sends object o to party j with (current sid)
         # recv(): returns (j, o) from party j
         self.send = send
@@ -33,47 +68,248 @@ class PassiveMpc(object):
         # So the protocol must encounter the shares in the same order.
         self.prog = prog
 
-        # Store deferreds representing SharedValues
+        # Openings are made in batches of consecutive share ids. All the
+        # opens requested during one iteration of the event loop are
+        # buffered in _outgoing, then broadcast and reconstructed as one
+        # batch by _flush. The batches waiting to be reconstructed are
+        # kept in order, along with the list of their ends.
         self._openings = []
-
-        # Store opened shares until ready to reconstruct
-        # shareid => { [playerid => share] }
+        self._opening_ends = []
+        self._outgoing = []
+        self._next_shareid = 0
+
+        # Number of opens, of shares opened, and of broadcasts
+        self.stats = {'opens': 0, 'shares': 0, 'broadcasts': 0}
+
+        # Shares opened and not reconstructed yet, the opens held back
+        # until fewer of them are (as (values, opening) in the order they
+        # were requested), and the futures of the calls to drain()
+        self.max_inflight = max_inflight
+        self._inflight = 0
+        self._deferred = deque()
+        self._drain_waiters = []
+
+        # Store opened shares until ready to reconstruct, as residues.
+        # The buffers only hold the share ids from _buffer_start on: the
+        # shares of the batches before it are dropped once reconstructed.
+        # playerid => [shareid - _buffer_start => share]
         self._share_buffers = tuple([] for _ in range(N))
+        self._buffer_start = 0
+        # playerid => number of shares received
+        self._received = [0] * N
 
-        self.Share = shareInContext(self)
-
-    def _reconstruct(self, shareid):
-        # Are there enough shares to reconstruct?
-        shares = [(i+1, self._share_buffers[i][shareid])
-                  for i in range(self.N)
-                  if len(self._share_buffers[i]) > shareid]
-        if len(shares) < self.t+1:
-            raise NotEnoughShares
-
-        # print('[%d] reconstruct %s' % (self.myid, shareid,))
+        # A batch is reconstructed once this many parties sent their shares
+        self._threshold = 2*t+1 if robust else t+1
 
-        if not self._openings[shareid].done():
-            s = Poly.interpolate_at(shares)
-            # Set the result on the future representing this share
-            self._openings[shareid].set_result(s)
+        self.Share = shareInContext(self)
+        self.ShareArray = shareArrayInContext(self)
+
+    def _reconstruct(self, start, end):
+        # Reconstruct from the parties that sent all the shares of the
+        # batch, or return None to wait for more shares
+        t = self.t
+        buffers = [(i+1, buf) for i, buf in enumerate(self._share_buffers)
+                   if self._received[i] >= end]
+        if not self.robust:
+            buffers = buffers[:t+1]
+        xs = [x for x, _ in buffers]
+        lo, hi = start - self._buffer_start, end - self._buffer_start
+        # The buffered shares are already reduced
+        columns = [FieldArray._from_ints(self.field, buf[lo:hi]) for _, buf in buffers]
+        if not self.robust:
+            return self.Poly.interpolate_columns(xs, columns)
+        return self._decode(xs, columns)
+
+    def _decode(self, xs, columns):
+        t = self.t
+        # A fresh parity check for every batch: with a fixed one, a party
+        # that learned it, e.g. from which of its bad shares went through,
+        # could send errors in its kernel in the later openings.
+        check = parity_check_vector(self.field, xs, t)
+        syndromes = self.field.linear_combination(check, columns).values
+        values = self.Poly.interpolate_columns(xs[:t+1], columns[:t+1])
+        failed = [i for i, s in enumerate(syndromes) if s]
+        if not failed:
+            return values
+
+        # Some shares are wrong. A decoded polynomial is only accepted
+        # once 2t+1 shares agree with it, so that t+1 of them are honest;
+        # until then, wait for more shares.
+        stores = [column.values for column in columns]
+        for i in failed:
+            ys = [store[i] for store in stores]
+            try:
+                f = self.Poly.decode(xs, ys, t)
+            except DecodingError:
+                f = None
+            if f is None or sum(f(x) == y for x, y in zip(xs, ys)) < 2*t+1:
+                if len(xs) == self.N:
+                    raise DecodingError(
+                        "shares do not agree on any polynomial of degree %d" % t)
+                return None
+            values[i] = f(0)
+        return values
+
+    def _try_reconstruct(self, batch):
+        # Set the results of the opens of a batch with enough shares.
+        # Returns whether the batch is done.
+        try:
+            values = self._reconstruct(batch.start, batch.end)
+        except DecodingError as e:
+            for _, _, opening in batch.openings:
+                opening.set_exception(e)
+            return True
+        if values is None:
+            return False
+        if len(batch.openings) == 1:
+            batch.openings[0][2].set_result(values)
+        else:
+            for first, last, opening in batch.openings:
+                opening.set_result(values[first-batch.start:last-batch.start])
+        return True
 
-    def open_share(self, share):
+    def _done(self, batch):
+        # Forget a reconstructed batch: drop the buffered shares that are
+        # no longer needed, and send the opens held back that fit under
+        # the cap again
+        if self._openings:
+            first = self._openings[0].start
+        elif self._outgoing:
+            first = self._outgoing[0][1]
+        else:
+            first = self._next_shareid
+        if first > self._buffer_start:
+            for buf in self._share_buffers:
+                del buf[:first - self._buffer_start]
+            self._buffer_start = first
+
+        self._inflight -= batch.end - batch.start
+        while self._deferred and not self._over_cap(len(self._deferred[0][0])):
+            self._start_open(*self._deferred.popleft())
+        if self._drain_waiters and not self._deferred:
+            for waiter in self._drain_waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+            self._drain_waiters = []
+
+    def _over_cap(self, k):
+        # Whether opening k more shares would go past max_inflight. An
+        # open larger than the cap is still sent once nothing is in flight.
+        return (self.max_inflight is not None and self._inflight > 0
+                and self._inflight + k > self.max_inflight)
+
+    async def drain(self):
+        """
+        Wait until every open held back by ``max_inflight`` has been
+        sent. Opens are capped without it; this only lets a program stop
+        producing work while the opened shares are reconstructed.
+        """
+        if not self._deferred:
+            return
+        waiter = asyncio.Future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    @property
+    def coalescing_factor(self):
+        """Average number of opens sent in one broadcast."""
+        return self.stats['opens'] / max(self.stats['broadcasts'], 1)
+
+    def open_array(self, values):
+        """
+        Open the shares with local values ``values`` (a
+        :class:`FieldArray`) as one batch of consecutive share ids.
+        Returns a future of the opened values, as a :class:`FieldArray`.
+
+        The shares are sent at the end of the current iteration of the
+        event loop, together with those of every other open requested
+        meanwhile: each party gets a single message with all of them,
+        and they are reconstructed at once. With ``max_inflight``, an open
+        that would put more shares than that in flight is held back until
+        enough of them are reconstructed; opens are still sent in the
+        order they are requested.
+        """
         opening = asyncio.Future()
-        shareid = len(self._openings)
-        self._openings.append(opening)
+        if self._deferred or self._over_cap(len(values)):
+            self._deferred.append((values, opening))
+        else:
+            self._start_open(values, opening)
+        return opening
 
-        # Broadcast share
+    def _start_open(self, values, opening):
+        start = self._next_shareid
+        end = self._next_shareid = start + len(values)
+        if start == end:
+            opening.set_result(self.field.array([]))
+            return
+        if not self._outgoing:
+            asyncio.get_event_loop().call_soon(self._flush)
+        self._outgoing.append((values, start, end, opening))
+        self._inflight += end - start
+
+    def _flush(self):
+        outgoing, self._outgoing = self._outgoing, []
+        start, end = outgoing[0][1], outgoing[-1][2]
+
+        # Broadcast the shares
+        data = b''.join([self.field.pack_many(values) for values, _, _, _ in outgoing])
         for j in range(self.N):
-            self.send(j, (shareid, share.v))
+            self.send(j, (start, data))
+        self.stats['opens'] += len(outgoing)
+        self.stats['shares'] += end - start
+        self.stats['broadcasts'] += 1
 
         # Reconstruct if we already had enough shares
-        try:
-            self._reconstruct(shareid)
-        except NotEnoughShares:
-            pass
+        batch = _Batch(start, end, [(first, last, opening)
+                                    for _, first, last, opening in outgoing])
+        batch.received = sum(received >= end for received in self._received)
+        if batch.received >= self._threshold and self._try_reconstruct(batch):
+            self._done(batch)
+        else:
+            self._openings.append(batch)
+            self._opening_ends.append(end)
+
+    def open_shares(self, shares):
+        """Open a list of shares as one batch, see :meth:`open_array`.
+        Returns a list with a future per share.
+        """
+        opening = self.open_array(self.field.array([share.v for share in shares]))
+        futures = [asyncio.Future() for _ in shares]
+
+        def cb(f):
+            if f.exception() is not None:
+                for future in futures:
+                    future.set_exception(f.exception())
+                return
+            for future, value in zip(futures, f.result()):
+                future.set_result(value)
+        opening.add_done_callback(cb)
+        return futures
 
-        # Return future
-        return opening
+    def open_share(self, share):
+        return self.open_shares([share])[0]
+
+    def beaver_multiply(self, x, y, triples=None):
+        """
+        Shares of the entry-wise products of the values shared by ``x``
+        and ``y`` (:class:`FieldArray` of local shares), with Beaver's
+        method: given shares of a, b and ab, the differences d = x - a and
+        e = y - b are opened, and xy = de + db + ea + ab.
+
+        The triples (three arrays a, b and ab) are taken from
+        :attr:`preprocessing` unless given. All the differences are opened
+        as one batch, along with the other opens and multiplications of
+        the same event-loop iteration. Returns a future of a
+        :class:`FieldArray`.
+        """
+        k = len(x)
+        a, b, ab = self.preprocessing.get_triples(k) if triples is None else triples
+        opening = self.open_array(self.field.array((x - a).values + (y - b).values))
+
+        def product(de):
+            d, e = de[:k], de[k:]
+            return d * e + d * b + e * a + ab
+        return _chain(opening, asyncio.Future(), product)
 
     async def _run(self):
         # Run receive loop as background task, until self.prog finishes
@@ -93,42 +329,41 @@ class PassiveMpc(object):
 
     async def _recvloop(self):
         while True:
-            (j, (shareid, share)) = await self.recv()
-            buf = self._share_buffers[j]
-
-            # Shareid is redundant, but confirm it is one greater
-            assert shareid == len(buf), "shareid: %d, len: %d" % (shareid, len(buf))
-            buf.append(share)
-
-            # Reconstruct if we now have enough shares,
-            # and if the opening has been asked for
-            if len(self._openings) > shareid:
-                try:
-                    self._reconstruct(shareid)
-                except NotEnoughShares:
-                    pass
+            (j, (shareid, data)) = await self.recv()
+
+            # Shareid is redundant, but confirm the block comes next
+            received = self._received[j]
+            assert shareid == received, "shareid: %d, received: %d" % (shareid, received)
+            values = self.field.unpack_many(data).values
+            received = self._received[j] = shareid + len(values)
+            # Skip the shares of the batches already reconstructed
+            skip = self._buffer_start - shareid
+            self._share_buffers[j].extend(values[skip:] if skip > 0 else values)
+
+            # Count this party for the batches that have been asked for
+            # and that it has now sent all of its shares of, i.e. those
+            # ending in (shareid, received], and reconstruct each batch
+            # once enough parties are counted
+            openings, ends = self._openings, self._opening_ends
+            i = bisect_right(ends, shareid)
+            while i < len(openings) and ends[i] <= received:
+                batch = openings[i]
+                batch.received += 1
+                if batch.received >= self._threshold and self._try_reconstruct(batch):
+                    del openings[i], ends[i]
+                    self._done(batch)
+                else:
+                    i += 1
 
         return True
 
     # File I/O
     def read_shares(self, f):
         # Read shares from a file object
-        lines = iter(f)
-        # first line: field modulus
-        modulus = int(next(lines))
-        assert Field.modulus == modulus
-        # second line: share degree
-        degree = int(next(lines))   # noqa
-        # third line: id
-        myid = int(next(lines))     # noqa
-        shares = []
-        # remaining lines: shared values
-        for line in lines:
-            shares.append(self.Share(int(line)))
-        return shares
+        return [self.Share(v) for v in read_share_values(f, self.field)]
 
     def write_shares(self, f, shares):
-        write_shares(f, Field.modulus, self.myid,
+        write_shares(f, self.field.modulus, self.t, self.myid,
                      [share.v for share in shares])
 
 
@@ -144,6 +379,17 @@ def write_shares(f, modulus, degree, myid, shares):
 ###############
 
 
+def _chain(fut, res, convert):
+    # Resolve res with convert(result of fut), or with its exception
+    def cb(f):
+        if f.exception() is not None:
+            res.set_exception(f.exception())
+        else:
+            res.set_result(convert(f.result()))
+    fut.add_done_callback(cb)
+    return res
+
+
 def shareInContext(context):
 
     def _binopField(fut, other, op):
@@ -175,7 +421,7 @@ def shareInContext(context):
         def __init__(self, v):
             # v is the local value of the share
             if type(v) is int:
-                v = Field(v)
+                v = context.field(v)
             assert type(v) is GFElement
             self.v = v
 
@@ -204,20 +450,37 @@ def shareInContext(context):
         # @typecheck(int,field)
         def __rmul__(self, other): return Share(self.v * other)
 
-        # @typecheck(Share)
-        # TODO
-        def __mul__(self, other): raise NotImplemented
+        # Products of shares are computed with a Beaver triple, and
+        # return a ShareFuture
+        def __mul__(self, other):
+            if isinstance(other, Share):
+                field = context.field
+                product = context.beaver_multiply(
+                    field.array([self.v]), field.array([other.v]))
+                return _chain(product, ShareFuture(), lambda values: Share(values[0]))
+            if isinstance(other, ShareFuture):
+                return other * self
+            if isinstance(other, (GFElement, int)):
+                return Share(self.v * other)
+            return NotImplemented
 
         def __str__(self): return '{%d}' % (self.v)
 
     def _binopShare(fut, other, op):
         assert type(other) in [ShareFuture, GFElementFuture, Share, GFElement]
         res = ShareFuture()
+
+        def _set(value):
+            # Products of shares are themselves futures
+            if isinstance(value, Future):
+                _chain(value, res, lambda share: share)
+            else:
+                res.set_result(value)
         if isinstance(other, Future):
-            def cb(_): return res.set_result(op(fut.result(), other.result()))
+            def cb(_): return _set(op(fut.result(), other.result()))
             asyncio.gather(fut, other).add_done_callback(cb)
         else:
-            def cb(_): return res.set_result(op(fut.result(), other))
+            def cb(_): return _set(op(fut.result(), other))
             fut.add_done_callback(cb)
         return res
 
@@ -245,15 +508,74 @@ def shareInContext(context):
 # Share = shareInContext(None)
 
 
+def shareArrayInContext(context):
+
+    class ShareArray(object):
+        def __init__(self, values):
+            # values are the local values of the shares, as a FieldArray,
+            # or a list of shares, elements or ints
+            if not isinstance(values, FieldArray):
+                values = context.field.array(
+                    [v.v if isinstance(v, context.Share) else v for v in values])
+            assert values.field is context.field
+            self.v = values
+
+        def __len__(self): return len(self.v)
+
+        def __getitem__(self, index):
+            if isinstance(index, slice):
+                return ShareArray(self.v[index])
+            return context.Share(self.v[index])
+
+        # Publicly reconstruct all the shared values as one batch,
+        # returns a future of a FieldArray
+        def open(self): return context.open_array(self.v)
+
+        # Linear combinations of shares can be computed directly, with
+        # the public operands broadcast or taken element-wise
+        def __add__(self, other):
+            if isinstance(other, ShareArray):
+                return ShareArray(self.v + other.v)
+            return ShareArray(self.v + other)
+        __radd__ = __add__
+
+        def __sub__(self, other):
+            if isinstance(other, ShareArray):
+                return ShareArray(self.v - other.v)
+            return ShareArray(self.v - other)
+
+        def __rsub__(self, other): return ShareArray(other - self.v)
+
+        # Products with public values are computed directly, products of
+        # shares with Beaver triples, and return a future of a ShareArray
+        def __mul__(self, other):
+            if isinstance(other, ShareArray):
+                return _chain(context.beaver_multiply(self.v, other.v),
+                              asyncio.Future(), ShareArray)
+            return ShareArray(self.v * other)
+
+        def __rmul__(self, other): return ShareArray(self.v * other)
+
+        def __str__(self): return '{%s}' % ', '.join(map(str, self.v.values))
+
+    return ShareArray
+
+
 # Create a fake network with N instances of the program
-async def runProgramAsTasks(program, N, t):
+async def runProgramAsTasks(program, N, t, field=None, robust=False,
+                            max_inflight=None, preprocessing=None):
+    # preprocessing is None or a list with the store of each party
+    # max_inflight caps the shares each party has opened and not
+    # reconstructed yet, see PassiveMpc.open_array
     loop = asyncio.get_event_loop()
     sends, recvs = simple_router(N)
 
     tasks = []
     # bgtasks = []
     for i in range(N):
-        context = PassiveMpc('sid', N, t, i, sends[i], recvs[i], program)
+        context = PassiveMpc('sid', N, t, i, sends[i], recvs[i], program, field,
+                             robust, max_inflight,
+                             None if preprocessing is None else preprocessing[i])
         tasks.append(loop.create_task(context._run()))
 
     results = await asyncio.gather(*tasks)
@@ -270,18 +592,17 @@ Poly = polynomialsOver(Field)
 
 
 def write_polys(prefix, modulus, N, t, polys):
+    # Evaluate all the polynomials at 1..N at once
+    shares = Poly.deal_many([f._residues() for f in polys], N)
     for i in range(N):
-        shares = [f(i+1) for f in polys]
         with open('%s-%d.share' % (prefix, i), 'w') as f:
-            write_shares(f, modulus, t, i, shares)
+            write_shares(f, modulus, t, i, shares[i])
 
 
 def generate_test_triples(prefix, k, N, t):
     # Generate k triples, store in files of form "prefix-%d.share"
     polys = []
-    for j in range(k):
-        a = Field(random.randint(0, Field.modulus-1))
-        b = Field(random.randint(0, Field.modulus-1))
+    for a, b in zip(Field.random_batch(k), Field.random_batch(k)):
         c = a*b
         polys.append(Poly.random(t, a))
         polys.append(Poly.random(t, b))
@@ -298,8 +619,8 @@ def generate_test_zeros(prefix, k, N, t):
 
 def generate_test_randoms(prefix, k, N, t):
     polys = []
-    for j in range(k):
-        polys.append(Poly.random(t, random.randint(0, Field.modulus-1)))
+    for secret in Field.random_batch(k):
+        polys.append(Poly.random(t, secret))
     write_polys(prefix, Field.modulus, N, t, polys)
 
 
@@ -312,25 +633,13 @@ async def test_prog1(context):
     zeros = context.read_shares(open(filename))
 
     filename = 'sharedata/test_triples-%d.share' % (context.myid,)
-    triples = context.read_shares(open(filename))
+    context.preprocessing.read_triples(open(filename))
 
-    # Example of Beaver multiplication
+    # Example of Beaver multiplication, with a triple from the store
     x = zeros[0] + context.Share(10)
     y = zeros[1] + context.Share(15)
+    xy = x * y
 
-    a, b, ab = triples[:3]
-    # assert await a.open() * await b.open() == await ab.open()
-
-    D = (x - a).open()
-    E = (y - b).open()
-
-    # This is a random share of x*y
-    print('type(D):', type(D))
-    print('type(b):', type(b))
-    xy = D*E + D*b + E*a + ab
-
-    print('type(x):', type(x))
-    print('type(y):', type(y))
     print('type(xy):', type(xy))
     X, Y, XY = await x.open(), await y.open(), await xy.open()
     assert X * Y == XY
@@ -1,14 +1,27 @@
-import operator
-import random
-from functools import reduce
-from .field import GF, GFElement
+from collections import OrderedDict
+from functools import lru_cache
+from .field import GF, GFElement, FieldArray, FieldsNotIdentical
+
+
+def _significant_length(a):
+    # Length of a without its trailing zeros
+    i = len(a)
+    while i and a[i-1] == 0:
+        i -= 1
+    return i
+
+
+def _residue(field, x):
+    # The residue of an element of field or an int, as an int
+    if type(x) is GFElement:
+        if x.field is not field:
+            raise FieldsNotIdentical
+        return x.value
+    return int(x)
 
 
 def strip_trailing_zeros(a):
-    for i in range(len(a), 0, -1):
-        if a[i-1] != 0:
-            break
-    return a[:i]
+    return a[:_significant_length(a)]
 
 
 _poly_cache = {}
@@ -19,11 +32,25 @@ def polynomialsOver(field):
         return _poly_cache[field]
 
     class Polynomial(object):
+        # The coefficients are a list of reduced ints, which may end with
+        # zeros: they are only stripped once the degree is needed. The
+        # list is shared with the polynomials derived from it without
+        # changes, and is never modified in place.
+        __slots__ = ('_values', '_size')
+
         def __init__(self, coeffs):
-            self.coeffs = strip_trailing_zeros(coeffs)
-            self.field = field
+            p = field.modulus
+            self._values = [v % p for v in field._residues(coeffs)]
+            self._size = None
+
+        @property
+        def coeffs(self):
+            """The coefficients, without trailing zeros, as a list of
+            :class:`GFElement`.
+            """
+            return [GFElement(v, field) for v in self._residues()]
 
-        def isZero(self): return self.coeffs == []
+        def isZero(self): return not self._residues()
 
         def __repr__(self):
             if self.isZero():
@@ -32,12 +59,145 @@ def polynomialsOver(field):
                                for i, a in enumerate(self.coeffs)])
 
         def __call__(self, x):
-            y = 0
+            """The value at ``x`` (an element of the field or an int), as
+            a :class:`GFElement`, even when the coefficients and ``x``
+            were given as ints.
+            """
+            x = _residue(field, x)
+            p = field.modulus
+            powers = []
             xx = 1
-            for coeff in self.coeffs:
-                y += coeff * xx
-                xx *= x
-            return y
+            coeffs = self._residues()
+            for _ in coeffs:
+                powers.append(xx)
+                xx = xx * x % p
+            return field.dot(coeffs, powers)
+
+        def _residues(self):
+            # The coefficients as reduced ints, without trailing zeros,
+            # copied only if there are trailing zeros to drop
+            if self._size is None:
+                self._size = _significant_length(self._values)
+            if self._size == len(self._values):
+                return self._values
+            return self._values[:self._size]
+
+        @classmethod
+        def _from_residues(cls, values):
+            # Wrap a list of reduced ints, which is not copied
+            poly = cls.__new__(cls)
+            poly._values = values
+            poly._size = None
+            return poly
+
+        def _coerce(self, other):
+            # Residues of a polynomial, or of a scalar as a constant
+            if isinstance(other, Polynomial):
+                return other._residues()
+            if type(other) is GFElement or isinstance(other, int):
+                return strip_trailing_zeros(field._residues([other]))
+            return None
+
+        def __add__(self, other):
+            """Sum with another polynomial, or with a scalar."""
+            b = self._coerce(other)
+            if b is None:
+                return NotImplemented
+            return self._from_residues(_add(self._residues(), b, field.modulus))
+
+        __radd__ = __add__
+
+        def __sub__(self, other):
+            """Difference with another polynomial, or with a scalar."""
+            b = self._coerce(other)
+            if b is None:
+                return NotImplemented
+            return self._from_residues(_sub(self._residues(), b, field.modulus))
+
+        def __rsub__(self, other):
+            return -self + other
+
+        def __neg__(self):
+            p = field.modulus
+            return self._from_residues([-c % p for c in self._residues()])
+
+        def derivative(self):
+            """The formal derivative."""
+            p = field.modulus
+            return self._from_residues(
+                [c * i % p for i, c in enumerate(self._residues())][1:])
+
+        def __mul__(self, other):
+            """Product with another polynomial, or with a scalar.
+
+            The algorithm depends on the size of the factors: schoolbook
+            multiplication, Karatsuba's method past KARATSUBA_THRESHOLD
+            coefficients, and NTTs past NTT_MUL_THRESHOLD when the field
+            has roots of unity of a large enough power-of-two order.
+            """
+            b = self._coerce(other)
+            if b is None:
+                return NotImplemented
+            return self._from_residues(_mul(self._residues(), b, field))
+
+        __rmul__ = __mul__
+
+        def __divmod__(self, divisor):
+            """Quotient and remainder of the division by ``divisor``.
+
+            Long divisions are done by multiplying with a power series
+            inverse of the reversed divisor, found by Newton iteration.
+            """
+            if not isinstance(divisor, Polynomial):
+                return NotImplemented
+            q, r = _divmod(self._residues(), divisor._residues(), field)
+            return self._from_residues(q), self._from_residues(r)
+
+        def __floordiv__(self, divisor):
+            return divmod(self, divisor)[0]
+
+        def __mod__(self, divisor):
+            return divmod(self, divisor)[1]
+
+        def evaluate_many(self, xs):
+            """
+            Evaluate at every point of ``xs``, with a subproduct tree over
+            the points: the polynomial is reduced modulo the products of
+            (X - x) over halves of the points, recursively, which takes
+            O(n log^2 n) operations for n points.
+            """
+            xs = [_residue(field, x) % field.modulus for x in xs]
+            if not xs:
+                return []
+            values = [0] * len(xs)
+            tree = _subproduct_tree(xs, 0, len(xs), field)
+            _evaluate_tree(self._residues(), tree, xs, values, field)
+            return [GFElement(v, field) for v in values]
+
+        @classmethod
+        def interpolate(cls, xs, ys):
+            """
+            The polynomial of degree less than n taking the values ``ys``
+            at the n distinct points ``xs``, interpolated with a
+            subproduct tree in O(n log^2 n) operations.
+            """
+            p = field.modulus
+            xs = [_residue(field, x) % p for x in xs]
+            ys = [_residue(field, y) % p for y in ys]
+            if len(xs) != len(ys):
+                raise ValueError("length mismatch: %d != %d" % (len(xs), len(ys)))
+            if not xs:
+                return cls([])
+            tree = _subproduct_tree(xs, 0, len(xs), field)
+            # The Lagrange weights are y_i / M'(x_i), for M the product of
+            # all the (X - x_i)
+            m = tree[0]
+            derivative = [i * c % p for i, c in enumerate(m)][1:]
+            values = [0] * len(xs)
+            _evaluate_tree(derivative, tree, xs, values, field)
+            weights = [y * w.value % p
+                       for y, w in zip(ys, field.batch_inverse(values))]
+            return cls._from_residues(_combine_tree(tree, xs, weights, field))
 
         @classmethod
         def interpolate_at(cls, shares, x_recomb=field(0)):
@@ -46,12 +206,138 @@ def polynomialsOver(field):
                 x_recomb = field(x_recomb)
             assert type(x_recomb) is GFElement
             xs, ys = zip(*shares)
-            vector = []
-            for i, x_i in enumerate(xs):
-                factors = [(x_k - x_recomb) / (x_k - x_i)
-                           for k, x_k in enumerate(xs) if k != i]
-                vector.append(reduce(operator.mul, factors))
-            return sum(map(operator.mul, ys, vector))
+            return field.dot(ys, lagrange_weights(field, xs, x_recomb))
+
+        @classmethod
+        def interpolate_many(cls, xs, ys_matrix, x_recomb=field(0)):
+            """
+            Reconstruct k secrets shared at the same points ``xs``, given
+            as a k-by-n matrix: one row of n shares per secret. Returns
+            the values at ``x_recomb`` as a :class:`FieldArray` of length
+            k, or a list of such arrays if ``x_recomb`` is a list of
+            points.
+            """
+            columns = [field.array(column) for column in zip(*ys_matrix)]
+            if not columns:
+                columns = [field.array([]) for _ in xs]
+            return cls.interpolate_columns(xs, columns, x_recomb)
+
+        @classmethod
+        def interpolate_columns(cls, xs, columns, x_recomb=field(0)):
+            """
+            Like :meth:`interpolate_many`, with the shares given as n
+            columns: ``columns[j]`` is a :class:`FieldArray` with the
+            shares at ``xs[j]`` of all k secrets.
+
+            Each target costs one weighted sum of the columns, so the
+            work is vectorized over the k secrets.
+            """
+            if len(columns) != len(xs):
+                raise ValueError("length mismatch: %d != %d" % (len(columns), len(xs)))
+            targets = x_recomb if isinstance(x_recomb, (list, tuple)) else [x_recomb]
+            results = [field.linear_combination(lagrange_weights(field, xs, x), columns)
+                       for x in targets]
+            if targets is x_recomb:
+                return results
+            return results[0]
+
+        @classmethod
+        def decode(cls, xs, ys, t):
+            """
+            The polynomial of degree at most t that agrees with all but at
+            most (n - t - 1) / 2 of the n points (xs, ys), found with Gao's
+            algorithm. Raises :class:`DecodingError` if there is none.
+            """
+            p = field.modulus
+            xs = [int(x) % p for x in xs]
+            ys = [int(y) % p for y in ys]
+            if len(xs) != len(ys):
+                raise ValueError("length mismatch: %d != %d" % (len(xs), len(ys)))
+            coeffs = _gao_decode(xs, ys, t, field)
+            if coeffs is None:
+                raise DecodingError("too many errors to decode %d points with "
+                                    "degree %d" % (len(xs), t))
+            return cls._from_residues(coeffs)
+
+        @classmethod
+        def robust_interpolate_at(cls, shares, t, x_recomb=field(0), check=None):
+            """
+            Like :meth:`interpolate_at`, for shares of a polynomial of
+            degree t some of which may be wrong. The shares are first
+            tested against ``check``, a :func:`parity_check_vector` for
+            their x coordinates (a fresh one by default), and only decoded
+            with :meth:`decode` if the test fails.
+            """
+            xs, ys = zip(*shares)
+            if check is None:
+                check = parity_check_vector(field, xs, t)
+            if field.dot(check, ys) == 0:
+                return cls.interpolate_at(shares[:t+1], x_recomb)
+            return cls.decode(xs, ys, t)(x_recomb)
+
+        @classmethod
+        def robust_interpolate_columns(cls, xs, columns, t, x_recomb=field(0),
+                                       check=None):
+            """
+            Like :meth:`interpolate_columns`, for k secrets shared with
+            polynomials of degree t, some of whose shares may be wrong.
+
+            All the secrets are tested at once against ``check``, a
+            :func:`parity_check_vector` for ``xs`` (a fresh one by
+            default), for the cost of one weighted sum of the columns.
+            The secrets that pass are interpolated from the first t+1
+            columns, and only those that fail are decoded with
+            :meth:`decode`.
+            """
+            if len(columns) != len(xs):
+                raise ValueError("length mismatch: %d != %d" % (len(columns), len(xs)))
+            if check is None:
+                check = parity_check_vector(field, xs, t)
+            syndromes = field.linear_combination(check, columns).values
+            results = cls.interpolate_columns(xs[:t+1], columns[:t+1], x_recomb)
+            failed = [i for i, s in enumerate(syndromes) if s]
+            if not failed:
+                return results
+            targets = x_recomb if isinstance(x_recomb, (list, tuple)) else [x_recomb]
+            arrays = results if targets is x_recomb else [results]
+            stores = [column.values for column in columns]
+            for i in failed:
+                f = cls.decode(xs, [store[i] for store in stores], t)
+                for array, x in zip(arrays, targets):
+                    array[i] = f(x)
+            return results
+
+        @classmethod
+        def deal_many(cls, coeff_matrix, n):
+            """
+            Evaluate k polynomials, given as a k-by-(t+1) matrix of
+            coefficients (rows may be shorter, the missing coefficients
+            being zero), at the points 1..n. Returns n columns of shares:
+            ``shares[i]`` is a :class:`FieldArray` with the values at i+1
+            of all k polynomials.
+            """
+            width = max((len(row) for row in coeff_matrix), default=0)
+            zero = [0] * width
+            columns = [field.array(column) for column in zip(
+                *[list(row) + zero[len(row):] for row in coeff_matrix])]
+            if not columns:
+                return [field.array([]) for _ in range(n)]
+            return cls.deal_columns(columns, n)
+
+        @classmethod
+        def deal_columns(cls, coeff_columns, n):
+            """
+            Like :meth:`deal_many`, with the coefficients given as t+1
+            columns: ``coeff_columns[j]`` is a :class:`FieldArray` with
+            the coefficient of x^j of all k polynomials.
+
+            The shares are the product of the coefficients with the
+            (t+1)-by-n Vandermonde matrix of the points 1..n, which is
+            cached per field, t and n.
+            """
+            vandermonde = _vandermonde(field, len(coeff_columns), n)
+            return [field.linear_combination(column, coeff_columns)
+                    for column in vandermonde]
 
         @classmethod
         def interpolate_fft(cls, ys, omega):
@@ -62,24 +348,23 @@ def polynomialsOver(field):
             n = len(ys)
             assert n & (n-1) == 0, "n must be power of two"
             assert type(omega) is GFElement
-            assert omega ** n == 1, "must be an n'th root of unity"
-            assert omega ** (n//2) != 1, "must be a primitive n'th root of unity"
-            coeffs = [b/n for b in fft_helper(ys, 1/omega, field)]
-            return cls(coeffs)
+            assert field.is_primitive_root_of_unity(omega, n), \
+                "must be a primitive n'th root of unity"
+            return cls._from_residues(intt(ys, omega, field).values)
 
         def evaluate_fft(self, omega, n):
             assert n & (n-1) == 0, "n must be power of two"
             assert type(omega) is GFElement
-            assert omega ** n == 1, "must be an n'th root of unity"
-            assert omega ** (n//2) != 1, "must be a primitive n'th root of unity"
+            assert field.is_primitive_root_of_unity(omega, n), \
+                "must be a primitive n'th root of unity"
             return fft(self, omega, n)
 
         @classmethod
-        def random(cls, degree, y0=None):
-            coeffs = [field(random.randint(0, field.modulus-1)) for _ in range(degree+1)]
+        def random(cls, degree, y0=None, rng=None):
+            coeffs = field.random_batch(degree+1, rng).values
             if y0 is not None:
-                coeffs[0] = y0
-            return cls(coeffs)
+                coeffs[0] = _residue(field, y0) % field.modulus
+            return cls._from_residues(coeffs)
 
         @classmethod
         def interp_extrap(cls, xs, omega):
@@ -88,42 +373,631 @@ def polynomialsOver(field):
             then evaluates at all points omega^i
             """
             n = len(xs)
-            assert n & (n-1) == 0, "n must be power of 2"
-            assert pow(omega, 2*n) == 1, "omega must be 2n'th root of unity"
-            assert pow(omega, n) != 1, "omega must be primitive 2n'th root of unity"
+            # The even points are the inputs themselves
+            odd = cls.interp_extrap_odd(xs, omega)
+            xs2 = [None] * (2*n)
+            xs2[0::2] = [x if type(x) is GFElement else field(x) for x in xs]
+            xs2[1::2] = odd
+            return xs2
 
-            # Interpolate the polynomial up to degree n
-            poly = cls.interpolate_fft(xs, omega**2)
+        @classmethod
+        def interp_extrap_odd(cls, xs, omega, count=None):
+            """
+            Interpolates the polynomial based on the even points omega^2i
+            then evaluates it at the first ``count`` (by default n) odd
+            points omega^(2i+1) only.
 
-            # Evaluate the polynomial
-            xs2 = poly.evaluate_fft(omega, 2*n)
+            For n a power of two and omega a primitive 2n'th root of
+            unity, this is ``interp_extrap(xs, omega)[1::2]``, computed
+            with an inverse NTT and a single NTT of size n on the coset
+            omega * <omega^2>, rather than a forward NTT of size 2n.
 
-            return xs2
+            Any other n and count only require the points to be distinct,
+            i.e. omega to have order at least 2n and 2*count: the
+            polynomial is interpolated from the geometric progression
+            omega^2i with :func:`interpolate_geometric`, and evaluated
+            with :func:`chirp_z`, so that nothing needs to be padded.
+            That is several times slower than the NTTs, so pad the values
+            with zeros to a power of two unless the extra points are
+            costly elsewhere.
+            """
+            n = len(xs)
+            if count is None:
+                count = n
+            omega_squared = omega * omega
+            if (n and not n & (n-1) and count <= n
+                    and field.is_primitive_root_of_unity(omega, 2*n)):
+                coeffs = intt(xs, omega_squared, field)
+                return coset_ntt(coeffs, omega_squared, omega, field).to_list()[:count]
+            coeffs = interpolate_geometric(xs, omega_squared, field)
+            return chirp_z(coeffs, omega_squared, count, field, omega).to_list()
 
+    Polynomial.field = field
     _poly_cache[field] = Polynomial
     return Polynomial
 
 
+@lru_cache(maxsize=64)
+def _vandermonde(field, width, n):
+    # The columns of the width-by-n Vandermonde matrix of the points
+    # 1..n, i.e. the powers x^j for j < width of each point x.
+    return tuple(tuple(_powers(field, x, width)) for x in range(1, n+1))
+
+
+@lru_cache(maxsize=256)
+def _lagrange_weights(field, xs, x_recomb):
+    # Weights for a frozenset of x coordinates, as a dict from each x to
+    # its weight. All the denominators are inverted together with a
+    # single inversion.
+    p = field.modulus
+    xs = sorted(xs)
+    numerators, denominators = [], []
+    for x_i in xs:
+        numerator = denominator = 1
+        for x_k in xs:
+            if x_k != x_i:
+                numerator = numerator * (x_k - x_recomb) % p
+                denominator = denominator * (x_k - x_i) % p
+        numerators.append(numerator)
+        denominators.append(denominator)
+    inverses = field.batch_inverse(denominators)
+    return {x: n * d.value % p for x, n, d in zip(xs, numerators, inverses)}
+
+
+def lagrange_weights(field, xs, x_recomb=0):
+    """
+    The Lagrange weights for interpolating at ``x_recomb`` from the values
+    at ``xs``, in the order of ``xs``: f(x_recomb) is the inner product of
+    the weights with [f(x) for x in xs], for f of degree less than
+    len(xs).
+
+    The weights only depend on the set of x coordinates, and are cached
+    per (field, frozenset(xs), x_recomb), so that reconstructing many
+    values from the same parties costs a dot product each.
+    """
+    p = field.modulus
+    xs = [_residue(field, x) % p for x in xs]
+    key = frozenset(xs)
+    if len(key) != len(xs):
+        raise ZeroDivisionError("Cannot interpolate from duplicate x coordinates")
+    weights = _lagrange_weights(field, key, _residue(field, x_recomb) % p)
+    return [weights[x] for x in xs]
+
+
 def get_omega(field, n, seed=None):
     """
     Given a field, this method returns an n^th root of unity.
-    If the seed is not None then this method will return the
-    same n'th root of unity for every run with the same seed
+
+    The roots are looked up in the field's precomputed table (see
+    ``GF.root_of_unity``), so every call with the same n returns the same
+    root. ``seed`` is accepted for backwards compatibility and ignored.
 
     This only makes sense if n is a power of 2!
     """
     assert n & n-1 == 0, "n must be a power of 2"
-    if seed is not None:
-        random.seed(seed)
-    x = field(random.randint(0, field.modulus-1))
-    y = pow(x, (field.modulus-1)//n)
-    if y == 1 or pow(y, n//2) == 1:
-        return get_omega(field, n)
-    assert pow(y, n) == 1, "omega must be 2n'th root of unity"
-    assert pow(y, n//2) != 1, "omega must be primitive 2n'th root of unity"
+    return field.root_of_unity(n)
+
+
+class _TableCache(object):
+    """Precomputed tables, evicted least recently used first once they
+    hold more than ``max_entries`` entries in total. Tables larger than
+    that are not kept at all.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = 0
+        self._tables = OrderedDict()
+
+    def get(self, key, make):
+        try:
+            self._tables.move_to_end(key)
+            return self._tables[key]
+        except KeyError:
+            pass
+        table = make()
+        if len(table) <= self.max_entries:
+            self._tables[key] = table
+            self.entries += len(table)
+            while self.entries > self.max_entries:
+                _, evicted = self._tables.popitem(last=False)
+                self.entries -= len(evicted)
+        return table
+
+
+# The bit-reversal permutations and twiddle factors of the NTTs, one table
+# of each per size. A table of 2^20 ints takes a few tens of MB for
+# 255-bit fields, so this holds the tables of a few sizes at most.
+NTT_CACHE_ENTRIES = 1 << 20
+_ntt_tables = _TableCache(NTT_CACHE_ENTRIES)
+
+
+def _bit_reversal(n):
+    """The bit-reversal permutation of range(n), for n a power of 2."""
+    bits = n.bit_length() - 1
+    reversal = [0] * n
+    for i in range(1, n):
+        reversal[i] = (reversal[i >> 1] >> 1) | ((i & 1) << (bits - 1))
+    return tuple(reversal)
+
+
+def _powers(field, x, count):
+    """The powers x^j for j < count, as a new list of ints."""
+    p = field.modulus
+    powers = [1] * count
+    for j in range(1, count):
+        powers[j] = powers[j-1] * x % p
+    return powers
+
+
+def _twiddles(field, omega, n):
+    """The powers omega^j for j < n/2 as an array, and whether omega is
+    the inverse of the field's n-th root of unity w rather than w itself.
+
+    Only the powers of w are cached, one table per (field, n): the
+    transform with w^-1 permutes its input and uses the same table. Other
+    roots of unity get a new table.
+    """
+    p = field.modulus
+    if n.bit_length() - 1 <= field.two_adicity:
+        w = field.root_of_unity(n).value
+        inverse = omega != w and omega * w % p == 1
+        if omega == w or inverse:
+            key = (field, field.backend.name, n)
+            table = _ntt_tables.get(
+                key, lambda: field.array(_powers(field, w, n // 2)))
+            return table, inverse
+    return field.array(_powers(field, omega, n // 2)), False
+
+
+def ntt(values, omega, field, n=None):
+    """
+    Evaluate the polynomial with coefficients ``values`` at
+    [omega^0, ..., omega^(n-1)], where omega is a primitive n-th root of
+    unity, and return the evaluations as a :class:`FieldArray`. By
+    default n is the number of values; fewer values are padded with
+    zeros as they are permuted, without copying them first.
+
+    This is an iterative, radix-2 Cooley-Tukey transform: the input is
+    permuted into bit-reversed order, then each of the log(n) stages
+    combines pairs of blocks with vectorized butterflies. The
+    permutation and the twiddle factors are cached per size, see
+    :func:`_twiddles`.
+    """
+    if n is None:
+        n = len(values)
+    assert not (n & (n-1)), "n must be a power of 2"
+    assert len(values) <= n
+    if isinstance(omega, GFElement):
+        omega = omega.value
+    residues = values.values if isinstance(values, FieldArray) else [
+        int(v) for v in values]
+    k = len(residues)
+    twiddles, inverse = _twiddles(field, omega % field.modulus, n)
+    reversal = _ntt_tables.get(n, lambda: _bit_reversal(n))
+    if inverse:
+        # sum_j a_j w^-jk = sum_j a_-j w^jk: transform the coefficients
+        # with negated indices (mod n) with w instead.
+        reversal = [-i % n for i in reversal]
+    if k == n:
+        a = field.array([residues[i] for i in reversal])
+    else:
+        a = field.array([residues[i] if i < k else 0 for i in reversal])
+
+    m = 1
+    while m < n:
+        blocks = n // (2*m)
+        if m <= blocks:
+            # Short blocks: for each butterfly position, process the
+            # entries at that position in all the blocks at once.
+            for j in range(m):
+                u = a[j::2*m]
+                v = a[j+m::2*m] * twiddles[j*blocks]
+                a[j::2*m], a[j+m::2*m] = u + v, u - v
+        else:
+            # Long blocks: process all the butterflies of a block at once.
+            w = twiddles[::blocks]
+            for start in range(0, n, 2*m):
+                u = a[start:start+m]
+                v = a[start+m:start+2*m] * w
+                a[start:start+m], a[start+m:start+2*m] = u + v, u - v
+        m *= 2
+    return a
+
+
+def intt(values, omega, field):
+    """
+    Inverse of :func:`ntt`: the coefficients, as a :class:`FieldArray`, of
+    the polynomial of degree less than n taking the given values at
+    [omega^0, ..., omega^(n-1)].
+    """
+    if not isinstance(omega, GFElement):
+        omega = field(omega)
+    return ntt(values, ~omega, field) * ~field(len(values))
+
+
+def coset_ntt(coeffs, omega, shift, field):
+    """
+    Evaluate the polynomial with coefficients ``coeffs`` on the coset
+    [shift * omega^0, ..., shift * omega^(n-1)], where omega is a
+    primitive n-th root of unity, as a :class:`FieldArray`.
+
+    Scaling the j-th coefficient by shift^j turns this into a plain
+    :func:`ntt` of the same size.
+    """
+    n = len(coeffs)
+    if isinstance(shift, GFElement):
+        shift = shift.value
+    if not isinstance(coeffs, FieldArray):
+        coeffs = field.array(coeffs)
+    return ntt(coeffs * field.array(_powers(field, shift, n)), omega, field)
+
+
+# Products where both factors have at least this many coefficients are
+# computed with Karatsuba's method, or with NTTs past NTT_MUL_THRESHOLD
+# when the field has large enough roots of unity
+KARATSUBA_THRESHOLD = 32
+NTT_MUL_THRESHOLD = 256
+
+# Divisions where both the divisor and the quotient have at least this
+# many coefficients use Newton iteration instead of long division
+NEWTON_DIV_THRESHOLD = 384
+
+# Point sets up to this size are handled directly at the leaves of
+# subproduct trees, with the quadratic algorithms
+SUBPRODUCT_LEAF_SIZE = 128
+
+
+def _mul_schoolbook(a, b, p):
+    # Accumulate unreduced products, reduce each coefficient once
+    if len(a) < len(b):
+        a, b = b, a
+    result = [0] * (len(a) + len(b) - 1)
+    for j, b_j in enumerate(b):
+        if b_j:
+            result[j:j+len(a)] = [r + b_j * a_i for r, a_i in zip(result[j:j+len(a)], a)]
+    return [r % p for r in result]
+
+
+def _mul_karatsuba(a, b, p):
+    if len(a) < len(b):
+        a, b = b, a
+    if len(b) < KARATSUBA_THRESHOLD:
+        return _mul_schoolbook(a, b, p)
+    m = len(a) // 2
+    result = [0] * (len(a) + len(b) - 1)
+    if len(b) <= m:
+        # Unbalanced factors: only split the longer one
+        for offset, part in ((0, a[:m]), (m, a[m:])):
+            product = _mul_karatsuba(part, b, p)
+            result[offset:offset+len(product)] = [
+                r + c for r, c in zip(result[offset:offset+len(product)], product)]
+        return [r % p for r in result]
+    a0, a1, b0, b1 = a[:m], a[m:], b[:m], b[m:]
+    low = _mul_karatsuba(a0, b0, p)
+    high = _mul_karatsuba(a1, b1, p)
+    # (a0 + a1)(b0 + b1) - a0 b0 - a1 b1 = a0 b1 + a1 b0
+    middle = _mul_karatsuba(_add(a0, a1, p), _add(b0, b1, p), p)
+    for offset, part, sign in ((0, low, 1), (2*m, high, 1), (m, middle, 1),
+                               (m, low, -1), (m, high, -1)):
+        result[offset:offset+len(part)] = [
+            r + sign * c for r, c in zip(result[offset:offset+len(part)], part)]
+    return [r % p for r in result]
+
+
+def _mul_ntt(a, b, field):
+    n = len(a) + len(b) - 1
+    size = 1 << (n - 1).bit_length()
+    omega = field.root_of_unity(size)
+    a_values = ntt(a, omega, field, size)
+    b_values = ntt(b, omega, field, size)
+    return intt(a_values * b_values, omega, field).values[:n]
+
+
+def _mul(a, b, field):
+    """Product of two coefficient lists of reduced ints."""
+    if not a or not b:
+        return []
+    n = len(a) + len(b) - 1
+    if (min(len(a), len(b)) >= NTT_MUL_THRESHOLD
+            and (n - 1).bit_length() <= field.two_adicity):
+        return _mul_ntt(a, b, field)
+    return _mul_karatsuba(a, b, field.modulus)
+
+
+def _add(a, b, p):
+    if len(a) < len(b):
+        a, b = b, a
+    return [(x + y) % p for x, y in zip(a, b)] + a[len(b):]
+
+
+def _sub(a, b, p):
+    if len(a) < len(b):
+        a = a + [0] * (len(b) - len(a))
+    return [(x - y) % p for x, y in zip(a, b)] + a[len(b):]
+
+
+def _inverse_series(a, m, field):
+    """The first m coefficients of the power series 1/a, for a[0] != 0."""
+    p = field.modulus
+    g = [(~field(a[0])).value]
+    k = 1
+    while k < m:
+        # Newton step: g <- g * (2 - a*g) mod x^2k
+        k = min(2*k, m)
+        e = _mul(a[:k], g, field)[:k]
+        e = [-c % p for c in e] + [0] * (k - len(e))
+        e[0] = (e[0] + 2) % p
+        g = _mul(g, e, field)[:k]
+    return g
+
+
+def _divmod(a, b, field):
+    """Quotient and remainder of two coefficient lists of reduced ints,
+    without trailing zeros.
+    """
+    if not b:
+        raise ZeroDivisionError("polynomial division by zero")
+    p = field.modulus
+    if len(a) < len(b):
+        return [], a
+    m = len(a) - len(b) + 1
+    if min(m, len(b)) >= NEWTON_DIV_THRESHOLD:
+        # The reversed quotient is the reversed dividend times the inverse
+        # of the reversed divisor, modulo x^m
+        inverse = _inverse_series(b[::-1], m, field)
+        q = _mul(a[::-1][:m], inverse, field)[:m]
+        q = q[::-1] + [0] * (m - len(q))
+        r = _sub(a, _mul(b, q, field), p)[:len(b)-1]
+        return strip_trailing_zeros(q), strip_trailing_zeros(r)
+
+    lead_inverse = (~field(b[-1])).value
+    r = list(a)
+    q = [0] * m
+    d = len(b)
+    for i in range(m - 1, -1, -1):
+        c = r[i+d-1] * lead_inverse % p
+        q[i] = c
+        if c:
+            r[i:i+d] = [(x - c * y) % p for x, y in zip(r[i:i+d], b)]
+    return strip_trailing_zeros(q), strip_trailing_zeros(r[:d-1])
+
+
+def _horner(coeffs, x, p):
+    y = 0
+    for c in reversed(coeffs):
+        y = (y * x + c) % p
     return y
 
 
+def _subproduct_tree(xs, lo, hi, field):
+    # A node is (M, lo, hi, left, right), where M is the product of
+    # (X - x) over xs[lo:hi]. Leaves have no children.
+    p = field.modulus
+    if hi - lo <= SUBPRODUCT_LEAF_SIZE:
+        m = [1]
+        for x in xs[lo:hi]:
+            # Multiply by (X - x)
+            m = [(u - x * v) % p for u, v in zip([0] + m, m + [0])]
+        return (m, lo, hi, None, None)
+    mid = (lo + hi) // 2
+    left = _subproduct_tree(xs, lo, mid, field)
+    right = _subproduct_tree(xs, mid, hi, field)
+    return (_mul(left[0], right[0], field), lo, hi, left, right)
+
+
+def _evaluate_tree(coeffs, node, xs, values, field):
+    # Reduce modulo M at each node, evaluate directly at the leaves
+    m, lo, hi, left, right = node
+    if len(coeffs) >= len(m):
+        coeffs = _divmod(coeffs, m, field)[1]
+    if left is None:
+        for i in range(lo, hi):
+            values[i] = _horner(coeffs, xs[i], field.modulus)
+    else:
+        _evaluate_tree(coeffs, left, xs, values, field)
+        _evaluate_tree(coeffs, right, xs, values, field)
+
+
+def _combine_tree(node, xs, weights, field):
+    # The sum over the points of the node of weights[i] * M / (X - xs[i])
+    p = field.modulus
+    m, lo, hi, left, right = node
+    if left is None:
+        result = [0] * (hi - lo)
+        for i in range(lo, hi):
+            # Synthetic division of M by (X - xs[i])
+            x, w = xs[i], weights[i]
+            q = 0
+            for k in range(hi - lo, 0, -1):
+                q = (m[k] + x * q) % p
+                result[k-1] += w * q
+        return [r % p for r in result]
+    left_sum = _combine_tree(left, xs, weights, field)
+    right_sum = _combine_tree(right, xs, weights, field)
+    return [(u + v) % p for u, v in zip(_mul(left_sum, right[0], field),
+                                        _mul(right_sum, left[0], field))]
+
+
+def _chirp(x, count, p):
+    # The powers x^C(k, 2) for k < count
+    chirp = [1] * count
+    power = 1
+    for k in range(1, count):
+        chirp[k] = chirp[k-1] * power % p
+        power = power * x % p
+    return chirp
+
+
+def chirp_z(coeffs, w, m, field, shift=1):
+    """
+    Evaluate the polynomial with coefficients ``coeffs`` at the m points
+    [shift * w^0, ..., shift * w^(m-1)] of a geometric progression, as a
+    :class:`FieldArray`.
+
+    This is Bluestein's algorithm: since jk = C(j+k, 2) - C(j, 2) -
+    C(k, 2), the values are a correlation of the coefficients, scaled by
+    shift^j w^-C(j, 2), with the chirp w^C(l, 2), which takes a single
+    polynomial product. Neither the number of coefficients nor m need to
+    be powers of two, and w need not be a root of unity.
+    """
+    p = field.modulus
+    if isinstance(coeffs, FieldArray):
+        a = coeffs.values
+    else:
+        a = [int(c) % p for c in coeffs]
+    n = len(a)
+    if not n or not m:
+        return field.array([0] * m)
+    w, shift = int(w) % p, int(shift) % p
+    if (n == m and not n & (n-1) and field.is_primitive_root_of_unity(w, n)):
+        return coset_ntt(a, w, shift, field)
+    chirp = _chirp(w, n + m - 1, p)
+    inverse_chirp = _chirp((~field(w)).value, max(n, m), p)
+    scaled = [c * s % p * i % p
+              for c, s, i in zip(a, _powers(field, shift, n), inverse_chirp)]
+    product = _mul(scaled[::-1], chirp, field)
+    return field.array([product[n-1+k] * inverse_chirp[k] for k in range(m)])
+
+
+def interpolate_geometric(values, q, field):
+    """
+    The coefficients, as a :class:`FieldArray`, of the polynomial of degree
+    less than n taking the given values at the n points [q^0, ..., q^(n-1)],
+    for q of multiplicative order at least n.
+
+    The Lagrange weights have closed forms in terms of the products
+    (q - 1)(q^2 - 1)...(q^k - 1), and combining them takes a
+    :func:`chirp_z` evaluation and one polynomial product, so that any n
+    is handled in about the time of a few NTTs of size 2n. For n a power
+    of two and q a primitive n'th root of unity, this is :func:`intt`.
+    """
+    p = field.modulus
+    if isinstance(values, FieldArray):
+        ys = values.values
+    else:
+        ys = [int(y) % p for y in values]
+    n = len(ys)
+    if not n:
+        return field.array([])
+    if not n & (n-1) and field.is_primitive_root_of_unity(q, n):
+        return intt(ys, q, field)
+    q = int(q) % p
+
+    # q_factorials[k] = (q - 1)(q^2 - 1)...(q^k - 1)
+    q_powers = _powers(field, q, n + 1)
+    q_factorials = [1] * (n + 1)
+    for k in range(1, n + 1):
+        q_factorials[k] = q_factorials[k-1] * (q_powers[k] - 1) % p
+
+    # The denominators of the Lagrange weights, prod_{j != i} (q^i - q^j),
+    # are (-1)^(n-1-i) q^e(i) q_factorials[i] q_factorials[n-1-i] with
+    # e(i) = C(i, 2) + i(n-1-i), and e(i+1) - e(i) = n-2-i.
+    denominators = [0] * n
+    q_e = 1
+    for i in range(n):
+        d = q_e * q_factorials[i] % p * q_factorials[n-1-i] % p
+        denominators[i] = d if (n - 1 - i) % 2 == 0 else p - d
+        if i < n - 1:
+            q_e = q_e * q_powers[n-2-i] % p
+    weights = [y * d.value % p for y, d in zip(ys, field.batch_inverse(denominators))]
+
+    # f(X) = M(X) * sum_i weights[i] / (X - q^i), for M the product of all
+    # the (X - q^i). Expanding 1/(X - q^i) in powers of 1/X, the sums
+    # s[k] = sum_i weights[i] q^ik are the values of the weights at q^k.
+    sums = chirp_z(weights, q, n, field).values
+
+    # The coefficient of X^(n-k) in M is (-1)^k q^C(k, 2) times the
+    # q-binomial coefficient q_factorials[n] / (q_factorials[k]
+    # q_factorials[n-k]).
+    inverses = [v.value for v in field.batch_inverse(q_factorials)]
+    chirp = _chirp(q, n + 1, p)
+    m = [0] * (n + 1)
+    for k in range(n + 1):
+        e = chirp[k] * q_factorials[n] % p * inverses[k] % p * inverses[n-k] % p
+        m[n-k] = e if k % 2 == 0 else (p - e) % p
+
+    # The coefficient of X^j in f is sum_k m[j+k+1] s[k]
+    product = _mul(m[1:], sums[::-1], field)
+    return field.array(product[n-1:2*n-1])
+
+
+class DecodingError(Exception):
+    pass
+
+
+def parity_check_vector(field, xs, t, rng=None):
+    """
+    A random vector h, as a list of ints, such that the sum of
+    h[i] * f(xs[i]) is zero for every f of degree at most t.
+
+    For M the product of the (X - x) over the n points, the weights
+    1/M'(x) sum the values of any polynomial of degree at most n - 2 to
+    zero, so h[i] = s(xs[i]) / M'(xs[i]) for a random s of degree at most
+    n - t - 2 is a random combination of all the parity checks of the
+    code. Values that are off every polynomial of degree t pass the check
+    with probability 1/p, as long as they were picked without knowing h.
+    For n <= t + 1 there is nothing to check and h is zero.
+
+    Every call draws a new s, so a fresh h costs O(n * (n - t)) once the
+    weights of ``xs`` are cached.
+    """
+    p = field.modulus
+    xs = tuple(int(x) % p for x in xs)
+    if len(set(xs)) != len(xs):
+        raise ZeroDivisionError("Cannot check duplicate x coordinates")
+    redundancy = len(xs) - t - 1
+    if redundancy <= 0:
+        return [0] * len(xs)
+    s = field.random_batch(redundancy, rng).values
+    return [_horner(s, x, p) * w % p
+            for x, w in zip(xs, _parity_weights(field, xs))]
+
+
+@lru_cache(maxsize=256)
+def _parity_weights(field, xs):
+    # The weights 1/M'(x) of a tuple of distinct x coordinates. Only the
+    # random s of a parity check changes from one vector to the next.
+    p = field.modulus
+    derivatives = []
+    for x_i in xs:
+        d = 1
+        for x_k in xs:
+            if x_k != x_i:
+                d = d * (x_i - x_k) % p
+        derivatives.append(d)
+    return tuple(d.value for d in field.batch_inverse(derivatives))
+
+
+def _gao_decode(xs, ys, t, field):
+    # Gao's decoder: for M the product of the (X - x) and g the
+    # interpolant of the points, run the extended Euclidean algorithm on
+    # (M, g) until the remainder r has degree below (n + t + 1) / 2. With
+    # at most (n - t - 1) / 2 errors, r = f * v for the message f and v
+    # the cofactor of g, which vanishes at the errors.
+    p = field.modulus
+    n = len(xs)
+    if not n:
+        return []
+    m = _subproduct_tree(xs, 0, n, field)[0]
+    g = polynomialsOver(field).interpolate(xs, ys)._residues()
+    r0, r1 = m, g
+    v0, v1 = [], [1]
+    while 2 * (len(r1) - 1) >= n + t + 1:
+        q, r = _divmod(r0, r1, field)
+        r0, r1 = r1, r
+        v0, v1 = v1, strip_trailing_zeros(_sub(v0, _mul(q, v1, field), p))
+    f, r = _divmod(r1, v1, field)
+    if r or len(f) > t + 1:
+        return None
+    # Past the decoding radius the quotient may be exact but far from
+    # the points
+    errors = sum(_horner(f, x, p) != y for x, y in zip(xs, ys))
+    if 2 * errors > n - t - 1:
+        return None
+    return f
+
+
 def fft_helper(A, omega, field):
     """
     Given coefficients A of polynomial this method does FFT and returns
@@ -132,30 +1006,15 @@ def fft_helper(A, omega, field):
     If the polynomial is a0*x^0 + a1*x^1 + ... + an*x^n then the coefficients
     list is of the form [a0, a1, ... , an].
     """
-    n = len(A)
-    assert not (n & (n-1)), "n must be a power of 2"
-
-    if n == 1:
-        return A
-
-    B, C = A[0::2], A[1::2]
-    B_bar = fft_helper(B, pow(omega, 2), field)
-    C_bar = fft_helper(C, pow(omega, 2), field)
-    A_bar = [field(1)]*(n)
-    for j in range(n):
-        k = (j % (n//2))
-        A_bar[j] = B_bar[k] + pow(omega, j) * C_bar[k]
-    return A_bar
+    return ntt(A, omega, field).to_list()
 
 
 def fft(poly, omega, n, seed=None):
     assert n & n-1 == 0, "n must be a power of 2"
-    assert len(poly.coeffs) <= n
-    assert pow(omega, n) == 1
-    assert pow(omega, n//2) != 1
-
-    paddedCoeffs = poly.coeffs + ([poly.field(0)] * (n-len(poly.coeffs)))
-    return fft_helper(paddedCoeffs, omega, poly.field)
+    coeffs = poly._residues()
+    assert len(coeffs) <= n
+    assert poly.field.is_primitive_root_of_unity(omega, n)
+    return ntt(coeffs, omega, poly.field, n).to_list()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+from .field import FieldArray
+from .polynomial import polynomialsOver
+
+
+class NotEnoughPreprocessing(Exception):
+    pass
+
+
+def read_share_values(f, field):
+    """
+    Read the values of the shares in a file object, written by
+    ``passive.write_shares``, as a list of ints.
+    """
+    lines = iter(f)
+    # first line: field modulus
+    modulus = int(next(lines))
+    assert field.modulus == modulus
+    # second line: share degree
+    degree = int(next(lines))   # noqa
+    # third line: id
+    myid = int(next(lines))     # noqa
+    # remaining lines: shared values
+    return [int(line) for line in lines]
+
+
+class PreprocessingStore(object):
+    """
+    The preprocessed shares of one party: Beaver triples (shares of
+    random a and b, and of their product), shares of random values and
+    shares of zero. They are added in bulk, and handed out in batches of
+    :class:`FieldArray` so that each share is only used once.
+    """
+
+    # Number of shares in one element of each kind
+    KINDS = {'triples': 3, 'randoms': 1, 'zeros': 1}
+
+    def __init__(self, field):
+        self.field = field
+        # kind => one list of residues per component, and the number of
+        # elements already handed out
+        self._pools = {kind: tuple([] for _ in range(width))
+                       for kind, width in self.KINDS.items()}
+        self._used = dict.fromkeys(self.KINDS, 0)
+
+    def available(self, kind):
+        """The number of elements of ``kind`` left."""
+        return len(self._pools[kind][0]) - self._used[kind]
+
+    def _add(self, kind, *columns):
+        p = self.field.modulus
+        columns = [[v % p for v in self.field._residues(column)] for column in columns]
+        if len(set(map(len, columns))) > 1:
+            raise ValueError("components of different lengths")
+        for pool, column in zip(self._pools[kind], columns):
+            pool.extend(column)
+
+    def _take(self, kind, k):
+        if k > self.available(kind):
+            raise NotEnoughPreprocessing(
+                "%d %s requested, %d left" % (k, kind, self.available(kind)))
+        start = self._used[kind]
+        pools = self._pools[kind]
+        arrays = [FieldArray._from_ints(self.field, pool[start:start+k])
+                  for pool in pools]
+        self._used[kind] = start + k
+        # Drop the elements handed out once they are the bulk of the pool
+        if 2 * self._used[kind] > len(pools[0]):
+            for pool in pools:
+                del pool[:self._used[kind]]
+            self._used[kind] = 0
+        return arrays
+
+    def add_triples(self, a, b, ab):
+        self._add('triples', a, b, ab)
+
+    def add_randoms(self, values):
+        self._add('randoms', values)
+
+    def add_zeros(self, values):
+        self._add('zeros', values)
+
+    def get_triples(self, k):
+        """The shares of k triples, as three arrays a, b and ab."""
+        return tuple(self._take('triples', k))
+
+    def get_randoms(self, k):
+        return self._take('randoms', k)[0]
+
+    def get_zeros(self, k):
+        return self._take('zeros', k)[0]
+
+    def read_triples(self, f):
+        """Add the triples of a share file, where they are stored as
+        a, b, ab, a, b, ab, ...
+        """
+        values = read_share_values(f, self.field)
+        self.add_triples(values[0::3], values[1::3], values[2::3])
+
+    def read_randoms(self, f):
+        self.add_randoms(read_share_values(f, self.field))
+
+    def read_zeros(self, f):
+        self.add_zeros(read_share_values(f, self.field))
+
+
+def deal_preprocessing(field, N, t, triples=0, randoms=0, zeros=0, rng=None):
+    """
+    Deal shares of degree t of the given numbers of triples, random
+    values and zeros to N parties, as a list of N stores. This stands in
+    for the offline phase in tests and simulations.
+    """
+    Poly = polynomialsOver(field)
+    stores = [PreprocessingStore(field) for _ in range(N)]
+
+    def deal(secrets):
+        k = len(secrets)
+        columns = [secrets] + [field.random_batch(k, rng) for _ in range(t)]
+        return Poly.deal_columns(columns, N)
+
+    a, b = field.random_batch(triples, rng), field.random_batch(triples, rng)
+    dealt = {
+        'triples': zip(deal(a), deal(b), deal(a * b)),
+        'randoms': zip(deal(field.random_batch(randoms, rng))),
+        'zeros': zip(deal(field.array([0] * zeros))),
+    }
+    for kind, shares in dealt.items():
+        for store, columns in zip(stores, shares):
+            store._add(kind, *columns)
+    return stores
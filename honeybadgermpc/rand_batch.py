@@ -1,5 +1,4 @@
 import asyncio
-import random
 from .field import GF
 from .polynomial import polynomialsOver, get_omega
 
@@ -16,8 +15,7 @@ Poly = polynomialsOver(Field)
 # Let N' be the number of parties whose shares are included
 # Let D be the nearest power of 2 >= N'B
 # Interpolate a degree-(D-1) polynomial using D points, padding w/ zeros
-# Interpolate the polynomial at D additional points
-# Output (N'-f)B of the poins
+# Evaluate the polynomial at (N'-f)B additional points, and output them
 
 
 class ShareRandom_Protocol(object):
@@ -43,8 +41,7 @@ class ShareRandom_Protocol(object):
 
         async def _run():
             # Provide random input to my own AVSS
-            for j in range(B):
-                v = Field(random.randint(0, Field.modulus))
+            for j, v in enumerate(Field.random_batch(B)):
                 self._avss[myid*B+j].inputFromDealer.set_result(v)
 
             # Wait to observe B of the AVSS for each of N-t parties complete
@@ -93,12 +90,14 @@ class ShareRandom_Protocol(object):
                     input_shares += await asyncio.gather(*_shares)
 
             print('input_shares:', len(input_shares))
+            # Padding is local, and the power-of-two transforms are much
+            # faster than interpolating exactly N'B points.
             input_shares = input_shares + ([Field(0)] * (D-len(input_shares)))
 
-            # Interpolate all the committed shares
-            omega = get_omega(Field, 2*D, seed=0)
-            outputs = Poly.interp_extrap(input_shares[:D], omega)
-            output_shares = outputs[1:2*((sum(valid)-f)*B):2]   # Pick the odd shares
+            # Interpolate all the committed shares at the even powers of
+            # omega, and evaluate at as many odd powers as we output
+            omega = get_omega(Field, 2*D)
+            output_shares = Poly.interp_extrap_odd(input_shares, omega, (sum(valid)-f)*B)
             print('output_shares:', len(output_shares))
 
             self.output.set_result(output_shares)
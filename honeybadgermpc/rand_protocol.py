@@ -119,10 +119,11 @@ class ShareSingle_Protocol(object):
             print(score)
 
             # Add up the committed shares
-            output = 0
+            total = Field.accumulator()
             for i in range(N):
                 if score[i] >= f+1:
-                    output += await self._avss[i].output
+                    total.add(await self._avss[i].output)
+            output = total.value()
 
             print('vecs with t+1 inputs:', score)
             print('Done')
@@ -1,33 +1,35 @@
 from .passive import Poly, Field
-from .polynomial import get_omega
-import asyncio
+from .polynomial import get_omega, interpolate_geometric, chirp_z
 import itertools
 
 
-def renameAndUnpackInputs(_a, _b, _c, d, m):
-    n = m // 2  # number of triples
-
-    def pad(arr, k): return arr + [Field(0)]*(d-len(arr))
-    a, b, c = pad(_a[:n], d), pad(_b[:n], d), pad(_c[:n], d)
-    x, y, z = pad(_a[n:], d), pad(_b[n:], d), pad(_c[n:], d)
+def renameAndUnpackInputs(_a, _b, _c, d):
+    # The first d triples are refined, the next d are used to multiply
+    a, b, c = _a[:d], _b[:d], _c[:d]
+    x, y, z = _a[d:2*d], _b[d:2*d], _c[d:2*d]
 
     return a, b, c, x, y, z
 
 
-def getExtrapolatedValues(a, b, d, omega):
-    _a = Poly.interp_extrap(Poly.interp_extrap(a, omega**2), omega)
-    _b = Poly.interp_extrap(Poly.interp_extrap(b, omega**2), omega)
-    return _a[2::4], _b[2::4], _a[1::2], _b[1::2]
+def getExtrapolatedValues(a, b, d, omega, count):
+    # a and b are the values of polynomials of degree less than d at the
+    # powers omega^4i. Interpolate each once, then evaluate it directly at
+    # the d points omega^(4i+2) and at the first count points omega^(2i+1).
+    rest, odd = [], []
+    for values in (a, b):
+        coeffs = interpolate_geometric(values, omega**4, Field)
+        rest.append(chirp_z(coeffs, omega**4, d, Field, omega**2).to_list())
+        odd.append(chirp_z(coeffs, omega**2, count, Field, omega).to_list())
+    return rest[0], rest[1], odd[0], odd[1]
 
 
 async def batchBeaver(context, a, b, x, y, z):
-    # TODO: Replace this with a batch implementation instead of having a loop
-    c = []
+    # Multiply the shares of a and b with the triples (x, y, z), opening
+    # all the differences as one batch
     assert len(a) == len(b) == len(x) == len(y) == len(z)
-    for _a, _b, _x, _y, _z in zip(a, b, x, y, z):
-        d, e = context.Share(_a - _x).open(), context.Share(_b - _y).open()
-        c.append(d*e + d*_y + e*_x + _z)
-    return await asyncio.gather(*c)
+    arrays = [context.field.array(values) for values in (a, b, x, y, z)]
+    c = await context.beaver_multiply(arrays[0], arrays[1], arrays[2:])
+    return c.to_list()
 
 
 async def refineTriples(context, a_dirty, b_dirty, c_dirty):
@@ -47,16 +49,16 @@ async def refineTriples(context, a_dirty, b_dirty, c_dirty):
 
     assert len(a_dirty) == len(b_dirty) == len(c_dirty)
     m = len(a_dirty)
-    d = m // 2 if m & m-1 == 0 else 2**(m-2).bit_length()
-    zeroes = d - m
-    omega = get_omega(Field, 4*d, 2)
-    a, b, c, x, y, z = renameAndUnpackInputs(a_dirty, b_dirty, c_dirty, d, m)
-    a_rest, b_rest, p, q = getExtrapolatedValues(a, b, d, omega)
+    d = m // 2
+    num_valid_triples = max(d - context.t + 1, 0)
+    # The evaluation points are powers of omega, which only needs an order
+    # of at least 4d: d need not be a power of 2, so nothing is padded.
+    omega = get_omega(Field, 4 * 2**(d-1).bit_length())
+    a, b, c, x, y, z = renameAndUnpackInputs(a_dirty, b_dirty, c_dirty, d)
+    a_rest, b_rest, p, q = getExtrapolatedValues(a, b, d, omega, num_valid_triples)
     c_rest = await batchBeaver(context, a_rest, b_rest, x, y, z)
     c = list(itertools.chain(*zip(c, c_rest)))
-    c_all = Poly.interp_extrap(c, omega)
-    pq = c_all[1::2]
-    num_valid_triples = d - context.t + 1 - zeroes
+    pq = Poly.interp_extrap_odd(c, omega, num_valid_triples)
     p_shares = map(context.Share, p[:num_valid_triples])
     q_shares = map(context.Share, q[:num_valid_triples])
     pq_shares = map(context.Share, pq[:num_valid_triples])
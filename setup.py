@@ -19,6 +19,7 @@ TEST_REQUIRES = [
     'flake8',
     'pytest',
     'pytest-asyncio',
+    'pytest-benchmark',
     'pytest-cov',
     'pytest-env',
 ]
@@ -37,11 +38,15 @@ DOCS_REQUIRE = [
 
 ETH_REQUIRES = ['web3', 'ethereum']
 
+# Vectorized FieldArray backends (see honeybadgermpc.field_backends)
+NUMPY_REQUIRES = ['numpy']
+
 EXTRAS = {
     'test': TEST_REQUIRES,
-    'dev': DEV_REQUIRES + TEST_REQUIRES + DOCS_REQUIRE,
+    'dev': DEV_REQUIRES + TEST_REQUIRES + DOCS_REQUIRE + NUMPY_REQUIRES,
     'docs': DOCS_REQUIRE,
     'eth': ETH_REQUIRES,
+    'numpy': NUMPY_REQUIRES,
 }
 
 here = os.path.abspath(os.path.dirname(__file__))
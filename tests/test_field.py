@@ -1,5 +1,6 @@
 import pytest
 import operator
+from random import randint
 
 
 def test_multiple_fields():
@@ -25,3 +26,223 @@ def test_invalid_operations_on_fields():
     for op in operators:
         with pytest.raises(FieldsNotIdentical):
             op(Field1(2), Field2(3))
+
+
+def test_field_array_arithmetic():
+    from honeybadgermpc.field import GF, FieldArray
+    Field = GF.get(17)
+    xs, ys = [3, 5, 16, 0], [7, 12, 1, 9]
+    a, b = Field.array(xs), Field.array(ys)
+    assert isinstance(a, FieldArray)
+    assert len(a) == len(xs)
+    assert (a + b).to_list() == [Field(x) + Field(y) for x, y in zip(xs, ys)]
+    assert (a - b).to_list() == [Field(x) - Field(y) for x, y in zip(xs, ys)]
+    assert (a * b).to_list() == [Field(x) * Field(y) for x, y in zip(xs, ys)]
+    assert (-a).to_list() == [-Field(x) for x in xs]
+    assert (a ** 3).to_list() == [Field(x) ** 3 for x in xs]
+
+
+def test_field_array_broadcast():
+    from honeybadgermpc.field import GF
+    Field = GF.get(17)
+    xs = [3, 5, 16, 0]
+    a = Field.array(xs)
+    assert (a + Field(4)).to_list() == [Field(x) + 4 for x in xs]
+    assert (4 + a).to_list() == [Field(x) + 4 for x in xs]
+    assert (a - 20).to_list() == [Field(x) - 20 for x in xs]
+    assert (1 - a).to_list() == [1 - Field(x) for x in xs]
+    assert (Field(5) * a).to_list() == [Field(x) * 5 for x in xs]
+
+
+def test_field_array_indexing_and_reductions():
+    from honeybadgermpc.field import GF
+    Field = GF.get(17)
+    xs, ys = [3, 5, 16, 0], [7, 12, 1, 9]
+    a, b = Field.array(xs), Field.array(ys)
+    assert a[2] == Field(16)
+    assert a[1::2] == Field.array(xs[1::2])
+    a[0] = Field(10)
+    a[2:] = [1, 1]
+    assert list(a) == [Field(10), Field(5), Field(1), Field(1)]
+    assert b.sum() == sum(ys) % 17
+    assert Field.array(xs).dot(b) == sum(x * y for x, y in zip(xs, ys)) % 17
+
+
+def test_invalid_operations_on_field_arrays():
+    from honeybadgermpc.field import GF, FieldsNotIdentical
+    Field1, Field2 = GF.get(17), GF.get(7)
+    a = Field1.array([1, 2, 3])
+    with pytest.raises(FieldsNotIdentical):
+        a + Field2.array([1, 2, 3])
+    with pytest.raises(FieldsNotIdentical):
+        a * Field2(3)
+    with pytest.raises(FieldsNotIdentical):
+        Field1.array([Field2(1)])
+    with pytest.raises(ValueError):
+        a + Field1.array([1, 2])
+
+
+def test_batch_inverse(GaloisField):
+    values = [GaloisField(randint(1, GaloisField.modulus-1)) for _ in range(20)]
+    assert GaloisField.batch_inverse(values) == [~v for v in values]
+    inverses = GaloisField.batch_inverse(GaloisField.array(values))
+    assert inverses.to_list() == [~v for v in values]
+    assert GaloisField.batch_inverse([]) == []
+    with pytest.raises(ZeroDivisionError):
+        GaloisField.batch_inverse(values + [GaloisField(0)])
+
+
+def test_element_is_slotted_and_picklable():
+    import pickle
+    from honeybadgermpc.field import GF
+    Field = GF.get(17)
+    x = Field(5)
+    assert not hasattr(x, '__dict__')
+    assert x.modulus == 17
+    y = pickle.loads(pickle.dumps(x))
+    assert y == x and y.field is Field
+
+
+def test_fixed_width_encoding(GaloisField):
+    assert GaloisField.byte_length == 32
+    x = GaloisField(randint(0, GaloisField.modulus-1))
+    data = x.to_bytes()
+    assert len(data) == 32
+    assert data == x.value.to_bytes(32, 'little')
+    assert GaloisField.from_bytes(data) == x
+    with pytest.raises(ValueError):
+        GaloisField.from_bytes(GaloisField.modulus.to_bytes(32, 'little'))
+    with pytest.raises(ValueError):
+        GaloisField.from_bytes(data[:-1])
+
+
+def test_pack_unpack_many(GaloisField):
+    values = [GaloisField(randint(0, GaloisField.modulus-1)) for _ in range(50)]
+    data = GaloisField.pack_many(values)
+    assert data == b''.join(v.to_bytes() for v in values)
+    assert GaloisField.pack_many(GaloisField.array(values)) == data
+    assert GaloisField.unpack_many(data).to_list() == values
+    assert GaloisField.unpack_many(memoryview(data)[32:64]).to_list() == values[1:2]
+    assert GaloisField.unpack_many(b'') == GaloisField.array([])
+    with pytest.raises(ValueError):
+        GaloisField.unpack_many(data[:-1])
+    with pytest.raises(ValueError):
+        GaloisField.unpack_many(GaloisField.modulus.to_bytes(32, 'little'))
+
+
+def test_dot_and_accumulator(GaloisField):
+    from honeybadgermpc.field import GF, FieldsNotIdentical
+    xs = [GaloisField(randint(0, GaloisField.modulus-1)) for _ in range(30)]
+    ys = [GaloisField(randint(0, GaloisField.modulus-1)) for _ in range(30)]
+    expected = GaloisField(0)
+    for x, y in zip(xs, ys):
+        expected += x * y
+    assert GaloisField.dot(xs, ys) == expected
+    assert GaloisField.dot(GaloisField.array(xs), ys) == expected
+    assert GaloisField.array(xs).dot(GaloisField.array(ys)) == expected
+
+    acc = GaloisField.accumulator()
+    acc.add_dot(xs[:10], ys[:10])
+    for x, y in zip(xs[10:], ys[10:]):
+        acc.add_product(x, y)
+    acc.add(xs[0])
+    assert acc.value() == expected + xs[0]
+
+    with pytest.raises(ValueError):
+        GaloisField.dot(xs, ys[:-1])
+    with pytest.raises(FieldsNotIdentical):
+        GaloisField.dot(xs[:1], [GF.get(17)(1)])
+
+
+def test_linear_combination(GaloisField):
+    from honeybadgermpc.field import GF, FieldsNotIdentical
+    arrays = [GaloisField.random_batch(10) for _ in range(4)]
+    coeffs = [GaloisField(randint(0, GaloisField.modulus-1)) for _ in range(3)] + [5]
+    expected = arrays[0] * coeffs[0]
+    for c, a in zip(coeffs[1:], arrays[1:]):
+        expected = expected + a * c
+    assert GaloisField.linear_combination(coeffs, arrays) == expected
+
+    with pytest.raises(ValueError):
+        GaloisField.linear_combination(coeffs[:-1], arrays)
+    with pytest.raises(ValueError):
+        GaloisField.linear_combination(coeffs, arrays[:-1] + [arrays[-1][:5]])
+    with pytest.raises(TypeError):
+        GaloisField.linear_combination(coeffs, arrays[:-1] + [list(arrays[-1])])
+    with pytest.raises(FieldsNotIdentical):
+        GaloisField.linear_combination([1], [GF.get(17).array([1])])
+
+
+def test_roots_of_unity(GaloisField):
+    assert GaloisField.two_adicity == 32
+    for k in (0, 1, 5, 32):
+        n = 2**k
+        omega = GaloisField.root_of_unity(n)
+        assert omega ** n == 1
+        assert n == 1 or omega ** (n//2) != 1
+        assert GaloisField.root_of_unity(n) == omega
+    assert GaloisField.root_of_unity(2**10) ** 2 == GaloisField.root_of_unity(2**9)
+    with pytest.raises(ValueError):
+        GaloisField.root_of_unity(2**33)
+    with pytest.raises(ValueError):
+        GaloisField.root_of_unity(6)
+
+
+def test_random_batch(GaloisField):
+    from pytest import raises
+    from honeybadgermpc.field import seeded_rng
+    values = GaloisField.random_batch(1000)
+    assert len(values) == 1000
+    assert all(0 <= v < GaloisField.modulus for v in values.values)
+    assert len(set(values.values)) == 1000
+    assert len(GaloisField.random_batch(0)) == 0
+
+    seeded = GaloisField.random_batch(100, seeded_rng(7))
+    assert seeded == GaloisField.random_batch(100, seeded_rng(7))
+    assert seeded != GaloisField.random_batch(100, seeded_rng(8))
+    # The type of the seed is part of it
+    assert seeded != GaloisField.random_batch(100, seeded_rng('7'))
+    assert GaloisField.random_batch(100, seeded_rng('7')) != \
+        GaloisField.random_batch(100, seeded_rng(b'7'))
+    with raises(TypeError):
+        seeded_rng(7.0)
+
+
+def test_random_batch_rejection_sampling():
+    from honeybadgermpc.field import GF, seeded_rng
+    # Just above a power of two, so that almost half the candidates are
+    # rejected
+    Field = GF.get(257)
+    values = Field.random_batch(5000, seeded_rng('rejection'))
+    assert len(values) == 5000
+    assert max(values.values) < 257
+    assert len(set(values.values)) == 257
+
+
+def test_is_primitive_root_of_unity(GaloisField):
+    omega = GaloisField.root_of_unity(2**10)
+    assert GaloisField.is_primitive_root_of_unity(omega, 2**10)
+    assert GaloisField.is_primitive_root_of_unity(omega, 2**10)
+    assert not GaloisField.is_primitive_root_of_unity(omega, 2**11)
+    assert not GaloisField.is_primitive_root_of_unity(omega, 2**9)
+    assert not GaloisField.is_primitive_root_of_unity(omega ** 2, 2**10)
+    assert GaloisField.is_primitive_root_of_unity(GaloisField(1), 1)
+    assert not GaloisField.is_primitive_root_of_unity(omega, 1)
+
+    # Only the most recently used pairs are remembered
+    GaloisField._primitive_roots.clear()
+    pairs = [(sign * GaloisField.root_of_unity(2**k), 2**k)
+             for k in range(2, 33) for sign in (1, -1)]
+    assert all(GaloisField.is_primitive_root_of_unity(w, n) for w, n in pairs)
+    assert len(GaloisField._primitive_roots) == GaloisField.PRIMITIVE_ROOT_CACHE_SIZE
+    assert (pairs[0][0].value, pairs[0][1]) not in GaloisField._primitive_roots
+    assert (pairs[-1][0].value, pairs[-1][1]) in GaloisField._primitive_roots
+
+
+def test_sqrt():
+    from honeybadgermpc.field import GF
+    Field = GF.get(2**127 - 1)
+    x = Field(randint(1, Field.modulus - 1))
+    assert (x * x).sqrt() in (x, -x)
+    with pytest.raises(AssertionError):
+        GF.get(17)(4).sqrt()
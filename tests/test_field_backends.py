@@ -0,0 +1,156 @@
+from random import randint
+
+from pytest import fixture, importorskip, mark, raises
+
+# NTT friendly (15 * 2^27 + 1, two-adicity 27), largest 32-bit prime,
+# Mersenne 2^61 - 1, NTT friendly 62-bit prime (two-adicity 33)
+SMALL_PRIMES = [2013265921, 4294967291, 2**61 - 1, 0x3fffffee00000001]
+
+
+@fixture(params=SMALL_PRIMES)
+def small_field(request):
+    importorskip('numpy')
+    from honeybadgermpc.field import GF
+    return GF.get(request.param)
+
+
+def test_backend_selection(small_field, GaloisField):
+    from honeybadgermpc.field_backends import IntListBackend, NumpyUint64Backend
+    assert isinstance(small_field.backend, NumpyUint64Backend)
+    assert isinstance(GaloisField.backend, IntListBackend)
+
+
+@mark.parametrize('op', ['add', 'sub', 'mul'])
+def test_numpy_backend_matches_int_backend(small_field, op):
+    from honeybadgermpc.field_backends import IntListBackend
+    p = small_field.modulus
+    reference = IntListBackend(p)
+    backend = small_field.backend
+    n = 1000
+    # Include the extreme residues
+    xs = [0, 1, p-1, p-1] + [randint(0, p-1) for _ in range(n)]
+    ys = [p-1, p-1, p-1, 0] + [randint(0, p-1) for _ in range(n)]
+    a, b = backend.from_ints(xs), backend.from_ints(ys)
+    expected = getattr(reference, op)(xs, ys)
+    assert backend.to_ints(getattr(backend, op)(a, b)) == expected
+    scalar = randint(0, p-1)
+    expected = getattr(reference, op)(xs, scalar)
+    assert backend.to_ints(getattr(backend, op)(a, scalar)) == expected
+
+
+def test_numpy_backend_unary_and_reductions(small_field):
+    from honeybadgermpc.field_backends import IntListBackend
+    p = small_field.modulus
+    reference = IntListBackend(p)
+    backend = small_field.backend
+    xs = [0, 1, p-1] + [randint(0, p-1) for _ in range(500)]
+    ys = [randint(0, p-1) for _ in range(len(xs))]
+    a, b = backend.from_ints(xs), backend.from_ints(ys)
+    assert backend.to_ints(backend.neg(a)) == reference.neg(xs)
+    assert backend.to_ints(backend.rsub(a, 5)) == reference.rsub(xs, 5)
+    assert backend.to_ints(backend.pow(a, 0)) == reference.pow(xs, 0)
+    assert backend.to_ints(backend.pow(a, 12345)) == reference.pow(xs, 12345)
+    assert backend.to_ints(backend.pow(a, p-2)) == reference.pow(xs, p-2)
+    assert backend.sum(a) == reference.sum(xs)
+    assert backend.dot(a, b) == reference.dot(xs, ys)
+    assert backend.to_ints(backend.combine([a, b], [3, p-1])) == reference.combine(
+        [xs, ys], [3, p-1])
+    with raises(ValueError):
+        backend.pow(a, -1)
+
+
+@mark.parametrize('modulus', [251, 65521, 2**24 - 3, 2**40 - 87, 2**61 - 1])
+def test_numpy_backend_from_bytes(modulus):
+    importorskip('numpy')
+    from honeybadgermpc.field import GF
+    from honeybadgermpc.field_backends import IntListBackend, NumpyUint64Backend
+    Field = GF.get(modulus)
+    backend = NumpyUint64Backend(modulus)
+    xs = [0, 1, modulus-1] + [randint(0, modulus-1) for _ in range(100)]
+    data = Field.pack_many(xs)
+    view = memoryview(data)
+    assert backend.to_ints(backend.from_bytes(view, Field.byte_length)) == xs
+    assert IntListBackend(modulus).from_bytes(view, Field.byte_length) == xs
+    assert backend.to_ints(backend.from_bytes(view[:0], Field.byte_length)) == []
+    data += modulus.to_bytes(Field.byte_length, 'little')
+    with raises(ValueError):
+        backend.from_bytes(memoryview(data), Field.byte_length)
+
+
+def test_field_array_on_small_field(small_field):
+    Field = small_field
+    p = Field.modulus
+    xs = [randint(0, p-1) for _ in range(100)]
+    ys = [randint(0, p-1) for _ in range(100)]
+    a, b = Field.array(xs), Field.array(ys)
+    assert (a * b + 3).to_list() == [Field(x) * Field(y) + 3 for x, y in zip(xs, ys)]
+    assert (1 - a)[10:20] == Field.array([1 - x for x in xs[10:20]])
+    assert a.dot(b) == Field.dot(xs, ys)
+    assert Field.batch_inverse(a[1:]).to_list() == [~Field(x) for x in xs[1:]]
+    assert Field.unpack_many(Field.pack_many(a)) == a
+    assert len(Field.random_batch(50)) == 50
+
+
+@mark.parametrize('backend', ['int', 'numpy'])
+def test_field_array_behaves_the_same_on_each_backend(backend):
+    importorskip('numpy')
+    from honeybadgermpc.field import GF
+    Field = GF.get(2**61 - 1)
+    xs = [randint(1, Field.modulus-1) for _ in range(20)]
+    try:
+        Field.set_backend(backend)
+        a = Field.array(xs)
+        assert (a ** -1).to_list() == [~Field(x) for x in xs]
+        assert (a ** -3).to_list() == [~Field(x) ** 3 for x in xs]
+        with raises(ZeroDivisionError):
+            Field.array([1, 0]) ** -1
+        # values is a copy of the residues
+        a.values[0] = 0
+        assert a.values == xs
+        with raises(TypeError):
+            Field.array([1, 2.5])
+    finally:
+        Field.set_backend()
+
+
+def test_polynomial_on_small_field(small_field):
+    from honeybadgermpc.polynomial import polynomialsOver, get_omega
+    Poly = polynomialsOver(small_field)
+    t = 5
+    poly = Poly.random(t)
+    shares = [(i, poly(i)) for i in range(1, t+2)]
+    assert Poly.interpolate_at(shares) == poly(0)
+    if small_field.two_adicity >= 4:
+        omega = get_omega(small_field, 16)
+        values = poly.evaluate_fft(omega, 16)
+        assert values == [poly(omega ** i) for i in range(16)]
+        assert Poly.interpolate_fft(values, omega).coeffs == poly.coeffs
+
+
+def test_set_backend():
+    importorskip('numpy')
+    from honeybadgermpc.field import GF
+    from honeybadgermpc.field_backends import IntListBackend, NumpyUint64Backend
+    Field = GF.get(2**61 - 1)
+    xs = [randint(0, Field.modulus-1) for _ in range(20)]
+    ys = [randint(0, Field.modulus-1) for _ in range(20)]
+    a = Field.array(xs)
+    try:
+        Field.set_backend('int')
+        assert isinstance(Field.backend, IntListBackend)
+        b = Field.array(ys)
+        assert (b * b).to_list() == [Field(y) ** 2 for y in ys]
+        # Arrays from different backends can be mixed
+        assert (a * b).to_list() == [Field(x) * Field(y) for x, y in zip(xs, ys)]
+        assert (b - a).to_list() == [Field(y) - Field(x) for x, y in zip(xs, ys)]
+        assert a.dot(b) == b.dot(a) == Field.dot(xs, ys)
+        b[:5] = a[:5]
+        b[5] = Field(1)
+        assert b.values == xs[:5] + [1] + ys[6:]
+        assert Field.unpack_many(Field.pack_many(b)).values == b.values
+        assert Field.batch_inverse(b[:10]).to_list() == [~x for x in b[:10]]
+    finally:
+        Field.set_backend()
+    assert isinstance(Field.backend, NumpyUint64Backend)
+    with raises(ValueError):
+        Field.set_backend('nonexistent')
@@ -1,4 +1,4 @@
-from pytest import mark
+from pytest import mark, raises
 
 
 @mark.asyncio
@@ -100,3 +100,256 @@ async def test_beaver_mul(random_polys, random_files_prefix, triples_files_prefi
     results = await runProgramAsTasks(_prog, N, t)
     assert len(results) == N
     assert all(res == x_secret * y_secret for res in results)
+
+
+@mark.asyncio
+async def test_open_shares_small_field():
+    from honeybadgermpc.field import GF
+    from honeybadgermpc.polynomial import polynomialsOver
+    from honeybadgermpc.passive import runProgramAsTasks
+    N, t = 4, 1
+    field = GF.get(2**61 - 1)
+    polys = [polynomialsOver(field).random(t) for _ in range(10)]
+
+    async def _prog(context):
+        shares = [context.Share(poly(context.myid+1)) for poly in polys]
+        return [await share.open() for share in shares]
+
+    results = await runProgramAsTasks(_prog, N, t, field)
+    assert all(secrets == [poly(0) for poly in polys] for secrets in results)
+
+
+@mark.asyncio
+async def test_robust_open():
+    from honeybadgermpc.polynomial import polynomialsOver
+    from honeybadgermpc.passive import runProgramAsTasks, Field
+    N, t = 4, 1
+    polys = [polynomialsOver(Field).random(t) for _ in range(10)]
+
+    async def _prog(context):
+        shares = [context.Share(poly(context.myid+1)) for poly in polys]
+        # One party opens wrong shares
+        if context.myid == 1:
+            shares = [share + context.Share(i+1) for i, share in enumerate(shares)]
+        return [await share.open() for share in shares]
+
+    results = await runProgramAsTasks(_prog, N, t, robust=True)
+    assert all(secrets == [poly(0) for poly in polys] for secrets in results)
+
+
+@mark.asyncio
+async def test_robust_open_draws_a_check_per_batch(monkeypatch):
+    from honeybadgermpc import passive
+    from honeybadgermpc.polynomial import polynomialsOver
+    from honeybadgermpc.passive import runProgramAsTasks, Field
+    N, t, rounds = 4, 1, 5
+    polys = [polynomialsOver(Field).random(t) for _ in range(3 * rounds)]
+    checks = []
+    parity_check_vector = passive.parity_check_vector
+
+    def recording(field, xs, t):
+        check = parity_check_vector(field, xs, t)
+        checks.append(check)
+        return check
+    monkeypatch.setattr(passive, 'parity_check_vector', recording)
+
+    async def _prog(context):
+        secrets = []
+        for r in range(rounds):
+            shares = [context.Share(poly(context.myid+1))
+                      for poly in polys[3*r:3*r+3]]
+            array = context.ShareArray(shares)
+            # One party corrupts its shares in every opening
+            if context.myid == 2:
+                array = array + (r + 1)
+            secrets += (await array.open()).to_list()
+        return secrets
+
+    results = await runProgramAsTasks(_prog, N, t, robust=True)
+    assert all(secrets == [poly(0) for poly in polys] for secrets in results)
+    # Each party and opening has its own random check
+    assert len(checks) >= N * rounds
+    assert len(set(map(tuple, checks))) == len(checks)
+
+
+def test_robust_needs_enough_parties():
+    from honeybadgermpc.passive import PassiveMpc
+    with raises(AssertionError):
+        PassiveMpc('sid', 3, 1, 0, None, None, None, robust=True)
+    PassiveMpc('sid', 3, 1, 0, None, None, None)
+
+
+@mark.asyncio
+@mark.parametrize("robust", [False, True])
+async def test_open_batches(robust):
+    import asyncio
+    from honeybadgermpc.polynomial import polynomialsOver
+    from honeybadgermpc.passive import PassiveMpc, Field
+    from honeybadgermpc.router import simple_router
+    N, t, k = 4, 1, 50
+    polys = [polynomialsOver(Field).random(t) for _ in range(k)]
+    secrets = [poly(0) for poly in polys]
+
+    async def _prog(context):
+        shares = [context.Share(poly(context.myid+1)) for poly in polys]
+        array = context.ShareArray(shares)
+        if robust and context.myid == 3:
+            array = array + 1
+        opened = await array.open()
+        assert opened.to_list() == secrets
+        # Linear combinations are opened the same way
+        assert (await (2 * array - array[:k]).open()) == opened
+        values = await asyncio.gather(*context.open_shares(shares[:10]))
+        assert values == secrets[:10]
+        assert context.open_shares([]) == []
+        return values
+
+    sends, recvs = simple_router(N)
+    messages = []
+
+    def counting(send):
+        def _send(j, o):
+            messages.append(o)
+            send(j, o)
+        return _send
+
+    contexts = [PassiveMpc('sid', N, t, i, counting(sends[i]), recvs[i], _prog,
+                           robust=robust) for i in range(N)]
+    await asyncio.gather(*[context._run() for context in contexts])
+    # One message per party and peer for each of the three batches
+    assert len(messages) == 3 * N * N
+
+
+@mark.asyncio
+async def test_open_coalescing():
+    from honeybadgermpc.polynomial import polynomialsOver
+    from honeybadgermpc.passive import runProgramAsTasks, Field
+    N, t = 4, 1
+    polys = [polynomialsOver(Field).random(t) for _ in range(6)]
+
+    async def _prog(context):
+        shares = [context.Share(poly(context.myid+1)) for poly in polys]
+        # Independent opens in the same tick share one broadcast
+        opened = [share.open() for share in shares[:4]]
+        array = context.ShareArray(shares[4:]).open()
+        values = [await value for value in opened] + (await array).to_list()
+        # Share ids still follow the order of the opens
+        last = await shares[0].open()
+        return values + [last], context.stats, context.coalescing_factor
+
+    results = await runProgramAsTasks(_prog, N, t)
+    for values, stats, factor in results:
+        assert values == [poly(0) for poly in polys] + [polys[0](0)]
+        assert stats == {'opens': 6, 'shares': 7, 'broadcasts': 2}
+        assert factor == 3
+
+
+@mark.asyncio
+async def test_reconstruct_once(monkeypatch):
+    from honeybadgermpc.polynomial import polynomialsOver
+    from honeybadgermpc.passive import runProgramAsTasks, Field, PassiveMpc
+    N, t = 7, 2
+    polys = [polynomialsOver(Field).random(t) for _ in range(5)]
+    calls = []
+    reconstruct = PassiveMpc._reconstruct
+
+    def _reconstruct(self, start, end):
+        calls.append((self.myid, start))
+        return reconstruct(self, start, end)
+    monkeypatch.setattr(PassiveMpc, '_reconstruct', _reconstruct)
+
+    async def _prog(context):
+        shares = [context.Share(poly(context.myid+1)) for poly in polys]
+        return [await share.open() for share in shares]
+
+    results = await runProgramAsTasks(_prog, N, t)
+    assert all(secrets == [poly(0) for poly in polys] for secrets in results)
+    # Each party reconstructs each opening exactly once
+    assert sorted(calls) == [(i, j) for i in range(N) for j in range(5)]
+
+
+@mark.asyncio
+async def test_bounded_buffers():
+    import asyncio
+    from honeybadgermpc.polynomial import polynomialsOver
+    from honeybadgermpc.passive import runProgramAsTasks, Field
+    N, t, cap = 4, 1, 20
+    polys = [polynomialsOver(Field).random(t) for _ in range(10)]
+
+    async def _prog(context):
+        shares = context.ShareArray([poly(context.myid+1) for poly in polys])
+        openings = []
+        for _ in range(30):
+            openings.append(shares.open())
+            await context.drain()
+            assert context._inflight <= cap
+        values = await asyncio.gather(*openings)
+        assert all(v.to_list() == [poly(0) for poly in polys] for v in values)
+        # Nothing is kept for the reconstructed openings
+        assert not context._openings and context._inflight == 0
+        assert not any(context._share_buffers)
+        return values
+
+    await runProgramAsTasks(_prog, N, t, max_inflight=cap)
+
+
+@mark.asyncio
+async def test_max_inflight_caps_opens():
+    import asyncio
+    from honeybadgermpc.polynomial import polynomialsOver
+    from honeybadgermpc.passive import runProgramAsTasks, Field
+    N, t, cap = 4, 1, 20
+    polys = [polynomialsOver(Field).random(t) for _ in range(10)]
+    secrets = [poly(0) for poly in polys]
+
+    async def _prog(context):
+        shares = context.ShareArray([poly(context.myid+1) for poly in polys])
+        # Without drain(), the opens past the cap are held back
+        openings = []
+        for _ in range(30):
+            openings.append(shares.open())
+            assert context._inflight <= cap
+        assert len(context._deferred) == 28
+        singles = [share.open() for share in shares[:3]]
+        # An open larger than the cap goes out once nothing is in flight
+        large = context.ShareArray([shares[0]] * (cap + 1)).open()
+        await context.drain()
+        values = await asyncio.gather(*openings)
+        assert all(v.to_list() == secrets for v in values)
+        assert await asyncio.gather(*singles) == secrets[:3]
+        assert (await large).to_list() == [secrets[0]] * (cap + 1)
+        assert not context._deferred and context._inflight == 0
+
+    await runProgramAsTasks(_prog, N, t, max_inflight=cap)
+
+
+@mark.asyncio
+async def test_beaver_mul_with_preprocessing():
+    import asyncio
+    from honeybadgermpc.polynomial import polynomialsOver
+    from honeybadgermpc.preprocessing import deal_preprocessing
+    from honeybadgermpc.passive import runProgramAsTasks, Field
+    N, t, k = 4, 1, 20
+    polys = [polynomialsOver(Field).random(t) for _ in range(2*k)]
+    secrets = [poly(0) for poly in polys]
+    stores = deal_preprocessing(Field, N, t, triples=2*k + 1)
+
+    async def _prog(context):
+        shares = [context.Share(poly(context.myid+1)) for poly in polys]
+        x, y = shares[:k], shares[k:]
+        # Independent products share one round of openings
+        products = [a * b for a, b in zip(x, y)]
+        assert context.stats['broadcasts'] == 0
+        values = await asyncio.gather(*[p.open() for p in products])
+        # Products of share futures, and of share arrays
+        z = await (products[0] * products[1]).open()
+        w = await (context.ShareArray(x) * context.ShareArray(y))
+        return values, z, await w.open(), context.stats['broadcasts']
+
+    results = await runProgramAsTasks(_prog, N, t, preprocessing=stores)
+    expected = [a * b for a, b in zip(secrets[:k], secrets[k:])]
+    for values, z, w, broadcasts in results:
+        assert values == expected and w.to_list() == expected
+        assert z == expected[0] * expected[1]
+        assert broadcasts == 6
+    assert all(store.available('triples') == 0 for store in stores)
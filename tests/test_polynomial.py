@@ -16,7 +16,13 @@ def test_poly_eval_at_k(GaloisField, Polynomial):
     poly3 = Polynomial(coeffs)  # random polynomial of degree d
     x = randint(0, GaloisField.modulus-1)
     y = sum([pow(x, i) * a for i, a in enumerate(coeffs)])
-    assert y == poly3(x)
+    assert poly3(x) == GaloisField(y)
+    assert poly3(GaloisField(x)) == poly3(x)
+
+    from pytest import raises
+    from honeybadgermpc.field import GF, FieldsNotIdentical
+    with raises(FieldsNotIdentical):
+        poly3(GF.get(17)(x))
 
 
 def test_evaluate_fft(GaloisField, Polynomial):
@@ -54,3 +60,307 @@ def test_interp_extrap(GaloisField, Polynomial):
     values = Polynomial.interp_extrap(ys, omega)
     for a, b in zip(ys, values[0:201:2]):  # verify only 100 points
         assert a == b
+
+
+def test_interpolate_at(GaloisField, Polynomial):
+    t = randint(1, 20)
+    poly = Polynomial.random(t)
+    shares = [(i, poly(i)) for i in range(1, t+2)]
+    assert Polynomial.interpolate_at(shares) == poly(0)
+    x = randint(0, GaloisField.modulus-1)
+    assert Polynomial.interpolate_at(shares, x) == poly(x)
+
+
+def test_lagrange_weights(GaloisField, Polynomial):
+    from pytest import raises
+    from honeybadgermpc.polynomial import lagrange_weights
+    poly = Polynomial.random(3)
+    xs = [4, 1, 3, 2]
+    weights = lagrange_weights(GaloisField, xs)
+    assert GaloisField.dot(weights, [poly(x) for x in xs]) == poly(0)
+    # The weights are cached by x set, whatever the order of the shares
+    assert lagrange_weights(GaloisField, [1, 2, 3, 4]) == [
+        weights[1], weights[3], weights[2], weights[0]]
+    shares = [(x, poly(x)) for x in reversed(xs)]
+    assert Polynomial.interpolate_at(shares) == poly(0)
+    with raises(ZeroDivisionError):
+        lagrange_weights(GaloisField, [1, 2, 2])
+
+
+def test_points_from_another_field(GaloisField, Polynomial):
+    from pytest import raises
+    from honeybadgermpc.field import GF, FieldsNotIdentical
+    from honeybadgermpc.polynomial import lagrange_weights
+    other = GF.get(17)
+    assert lagrange_weights(GaloisField, [GaloisField(1), 2], GaloisField(3)) == \
+        lagrange_weights(GaloisField, [1, 2], 3)
+    with raises(FieldsNotIdentical):
+        lagrange_weights(GaloisField, [other(1), 2])
+    with raises(FieldsNotIdentical):
+        lagrange_weights(GaloisField, [1, 2], other(3))
+    with raises(FieldsNotIdentical):
+        Polynomial.random(3, y0=other(5))
+    with raises(FieldsNotIdentical):
+        Polynomial.random(3).evaluate_many([1, other(2)])
+    with raises(FieldsNotIdentical):
+        Polynomial.interpolate([1, 2], [other(1), 5])
+
+
+def test_interpolate_many(GaloisField, Polynomial):
+    t, k = 3, 20
+    polys = [Polynomial.random(t) for _ in range(k)]
+    xs = [1, 3, 5, 7, 9]
+    ys_matrix = [[poly(x) for x in xs] for poly in polys]
+    secrets = Polynomial.interpolate_many(xs, ys_matrix)
+    assert secrets.to_list() == [poly(0) for poly in polys]
+
+    targets = [0, 2, GaloisField(11)]
+    values = Polynomial.interpolate_many(xs, ys_matrix, targets)
+    assert len(values) == 3
+    for x, column in zip(targets, values):
+        assert column.to_list() == [poly(x) for poly in polys]
+
+    columns = [GaloisField.array(column) for column in zip(*ys_matrix)]
+    assert Polynomial.interpolate_columns(xs, columns) == secrets
+    assert len(Polynomial.interpolate_many(xs, [])) == 0
+
+
+def test_deal_many(GaloisField, Polynomial):
+    n, t, k = 7, 2, 10
+    polys = [Polynomial.random(t) for _ in range(k)] + [Polynomial([5])]
+    shares = Polynomial.deal_many([poly.coeffs for poly in polys], n)
+    assert len(shares) == n
+    for x, column in enumerate(shares, 1):
+        assert column.to_list() == [poly(x) for poly in polys]
+
+    columns = [GaloisField.array([poly.coeffs[j] for poly in polys[:k]])
+               for j in range(t+1)]
+    assert Polynomial.deal_columns(columns, n)[3] == shares[3][:k]
+    assert [len(column) for column in Polynomial.deal_many([], 3)] == [0, 0, 0]
+
+
+def test_get_omega_is_deterministic(GaloisField):
+    import random
+    state = random.getstate()
+    omega = get_omega(GaloisField, 2**10, seed=1)
+    assert random.getstate() == state
+    assert get_omega(GaloisField, 2**10) == omega
+    assert omega ** (2**10) == 1
+    assert omega ** (2**9) != 1
+
+
+def test_random_polynomial(GaloisField, Polynomial):
+    from honeybadgermpc.field import seeded_rng
+    poly = Polynomial.random(5, y0=GaloisField(42))
+    assert poly(0) == 42
+    assert len(poly.coeffs) <= 6
+    assert Polynomial.random(5, rng=seeded_rng(1)).coeffs == \
+        Polynomial.random(5, rng=seeded_rng(1)).coeffs
+
+
+def test_ntt(GaloisField):
+    from honeybadgermpc.polynomial import ntt
+    p = GaloisField.modulus
+    for n in (1, 2, 4, 8, 64):
+        coeffs = [randint(0, p-1) for _ in range(n)]
+        omega = get_omega(GaloisField, n)
+        expected = [sum(a * pow(omega.value, i*j, p) for j, a in enumerate(coeffs)) % p
+                    for i in range(n)]
+        assert ntt(coeffs, omega, GaloisField).values == expected
+        # The inverse transform, up to a factor of n
+        values = ntt(GaloisField.array(expected), ~omega, GaloisField)
+        assert values == GaloisField.array(coeffs) * n
+
+        # Fewer coefficients than points, and another primitive root
+        for w in (~omega, omega ** 3):
+            expected = [sum(a * pow(w.value, i*j, p) for j, a in enumerate(coeffs[:3]))
+                        % p for i in range(n)]
+            assert ntt(coeffs[:3], w, GaloisField, n).values == expected
+
+
+def test_ntt_table_cache(GaloisField):
+    from honeybadgermpc.polynomial import _TableCache
+    cache = _TableCache(10)
+    a = cache.get('a', lambda: (1,) * 4)
+    b = cache.get('b', lambda: (2,) * 4)
+    assert cache.get('a', lambda: None) is a
+    # Adding c goes past 10 entries, and evicts b, the least recently used
+    cache.get('c', lambda: (3,) * 4)
+    assert cache.entries == 8
+    assert cache.get('b', lambda: (4,) * 4) is not b
+    assert cache.get('big', lambda: (5,) * 11) == (5,) * 11
+    assert cache.entries == 8
+
+
+def test_coset_ntt(GaloisField, Polynomial):
+    from honeybadgermpc.polynomial import coset_ntt, intt
+    n = 16
+    coeffs = [randint(0, GaloisField.modulus-1) for _ in range(n)]
+    poly = Polynomial(coeffs)
+    omega = get_omega(GaloisField, n)
+    shift = GaloisField(7)
+    values = coset_ntt(coeffs, omega, shift, GaloisField)
+    assert values.to_list() == [poly(shift * omega**i) for i in range(n)]
+    assert intt(poly.evaluate_fft(omega, n), omega, GaloisField).to_list() == poly.coeffs
+
+
+def test_interp_extrap_odd(GaloisField, Polynomial):
+    n = 32
+    ys = [randint(0, GaloisField.modulus-1) for _ in range(n)]
+    omega = get_omega(GaloisField, 2*n)
+    poly = Polynomial.interpolate_fft(ys, omega**2)
+    odd = Polynomial.interp_extrap_odd(ys, omega)
+    assert odd == [poly(omega**(2*i+1)) for i in range(n)]
+    assert Polynomial.interp_extrap(ys, omega)[1::2] == odd
+
+
+def test_mul_and_divmod(GaloisField, Polynomial, monkeypatch):
+    from pytest import raises
+    import honeybadgermpc.polynomial as polynomial
+    x = GaloisField(randint(0, GaloisField.modulus-1))
+    # Small thresholds, so that the Karatsuba, NTT and Newton paths are
+    # taken too
+    for karatsuba, threshold in ((10**9, 10**9), (4, 10**9), (4, 4)):
+        monkeypatch.setattr(polynomial, 'KARATSUBA_THRESHOLD', karatsuba)
+        monkeypatch.setattr(polynomial, 'NTT_MUL_THRESHOLD', threshold)
+        monkeypatch.setattr(polynomial, 'NEWTON_DIV_THRESHOLD', threshold)
+        a, b = Polynomial.random(40), Polynomial.random(15)
+        product = a * b
+        assert len(product.coeffs) == 56
+        assert product(x) == a(x) * b(x)
+        q, r = divmod(product, b)
+        assert q.coeffs == a.coeffs and r.isZero()
+        q, r = divmod(a, b)
+        assert len(q.coeffs) == 26 and len(r.coeffs) <= 15
+        assert a(x) == q(x) * b(x) + r(x)
+        assert (a // b).coeffs == q.coeffs and (a % b).coeffs == r.coeffs
+        assert divmod(b, a)[1].coeffs == b.coeffs
+    assert (a * 3)(x) == 3 * a(x)
+    assert (GaloisField(2) * a)(x) == 2 * a(x)
+    assert (a * Polynomial([])).isZero()
+    with raises(ZeroDivisionError):
+        divmod(a, Polynomial([0]))
+
+
+def test_karatsuba(GaloisField):
+    from honeybadgermpc.polynomial import _mul_karatsuba, _mul_schoolbook
+    p = GaloisField.modulus
+    for m, n in ((100, 100), (100, 7), (64, 33), (33, 200)):
+        a = [randint(0, p-1) for _ in range(m)]
+        b = [randint(0, p-1) for _ in range(n)]
+        assert _mul_karatsuba(a, b, p) == _mul_schoolbook(a, b, p)
+
+
+def test_additive_operators_and_derivative(GaloisField, Polynomial):
+    x = GaloisField(randint(0, GaloisField.modulus-1))
+    a, b = Polynomial.random(5), Polynomial.random(8)
+    assert (a + b)(x) == a(x) + b(x)
+    assert (a - b)(x) == a(x) - b(x)
+    assert (b - b).isZero()
+    assert (-a)(x) == -a(x)
+    assert (a + 3)(x) == a(x) + 3
+    assert (3 - a)(x) == 3 - a(x)
+    assert (GaloisField(2) + a)(x) == a(x) + 2
+    poly = Polynomial([5, 1, 0, 4])
+    assert poly.derivative().coeffs == [1, 0, 12]
+    assert Polynomial([5]).derivative().isZero()
+    assert (a * b).derivative()(x) == (a.derivative() * b + a * b.derivative())(x)
+
+
+def test_evaluate_many_and_interpolate(GaloisField, Polynomial, monkeypatch):
+    from pytest import raises
+    import honeybadgermpc.polynomial as polynomial
+    monkeypatch.setattr(polynomial, 'SUBPRODUCT_LEAF_SIZE', 4)
+    n = 50
+    poly = Polynomial.random(n-1)
+    xs = [randint(0, GaloisField.modulus-1) for _ in range(n)]
+    values = poly.evaluate_many(xs)
+    assert values == [poly(x) for x in xs]
+    assert Polynomial.interpolate(xs, values).coeffs == poly.coeffs
+    assert Polynomial.interpolate(range(1, 4), [1, 2, 3]).coeffs == [0, 1]
+    assert Polynomial([]).evaluate_many([1, 2]) == [0, 0]
+    with raises(ZeroDivisionError):
+        Polynomial.interpolate([1, 1], [1, 2])
+
+
+def test_chirp_z_and_interpolate_geometric(GaloisField, Polynomial):
+    from pytest import raises
+    from honeybadgermpc.polynomial import chirp_z, interpolate_geometric
+    for n in (1, 7, 16, 45):
+        poly = Polynomial.random(n-1)
+        w = GaloisField(randint(2, GaloisField.modulus-1))
+        shift = GaloisField(randint(1, GaloisField.modulus-1))
+        for m in (1, n, 2*n + 1):
+            values = chirp_z(poly.coeffs, w, m, GaloisField, shift)
+            assert values.to_list() == [poly(shift * w**k) for k in range(m)]
+        ys = [poly(w**i) for i in range(n)]
+        assert interpolate_geometric(ys, w, GaloisField).to_list() == poly.coeffs
+    # The points must be distinct
+    with raises(ZeroDivisionError):
+        interpolate_geometric([1, 2, 3], get_omega(GaloisField, 2), GaloisField)
+
+
+def test_interp_extrap_odd_any_length(GaloisField, Polynomial):
+    n = 37
+    ys = [randint(0, GaloisField.modulus-1) for _ in range(n)]
+    omega = get_omega(GaloisField, 128)
+    poly = Polynomial.interpolate([omega**(2*i) for i in range(n)], ys)
+    odd = Polynomial.interp_extrap_odd(ys, omega, 20)
+    assert odd == [poly(omega**(2*i+1)) for i in range(20)]
+    # Power-of-two sizes take the NTT path, with any count
+    ys = ys[:32]
+    omega = get_omega(GaloisField, 64)
+    assert Polynomial.interp_extrap_odd(ys, omega, 5) == \
+        Polynomial.interp_extrap_odd(ys, omega)[:5]
+    assert len(Polynomial.interp_extrap_odd(ys, omega, 40)) == 40
+
+
+def test_decode(GaloisField, Polynomial):
+    from pytest import raises
+    from honeybadgermpc.polynomial import parity_check_vector, DecodingError
+    for n, t in ((4, 1), (7, 2), (31, 10)):
+        poly = Polynomial.random(t)
+        xs = list(range(1, n+1))
+        ys = [poly(x) for x in xs]
+        check = parity_check_vector(GaloisField, xs, t)
+        assert GaloisField.dot(check, ys) == 0
+        # Up to (n - t - 1) / 2 wrong values are corrected
+        for i in range((n - t - 1) // 2):
+            ys[2*i] += 1
+        assert GaloisField.dot(check, ys) != 0
+        assert Polynomial.decode(xs, ys, t).coeffs == poly.coeffs
+        assert Polynomial.robust_interpolate_at(list(zip(xs, ys)), t, 5) == poly(5)
+    # With t+1 points there is nothing to check or correct
+    assert parity_check_vector(GaloisField, [1, 2], 1) == [0, 0]
+    with raises(DecodingError):
+        Polynomial.decode([1, 2, 3], [0, 0, 1], 1)
+
+
+def test_robust_interpolate_columns(GaloisField, Polynomial):
+    n, t, k = 7, 2, 20
+    xs = list(range(1, n+1))
+    polys = [Polynomial.random(t) for _ in range(k)]
+    columns = [GaloisField.array([poly(x) for poly in polys]) for x in xs]
+    columns[0][7] = 0
+    columns[4][7] += 1
+    columns[3][11] += 1
+    secrets = Polynomial.robust_interpolate_columns(xs, columns, t)
+    assert secrets.to_list() == [poly(0) for poly in polys]
+    values = Polynomial.robust_interpolate_columns(xs, columns, t, [0, 9])
+    assert values[1].to_list() == [poly(9) for poly in polys]
+
+
+def test_coefficient_store(GaloisField, Polynomial):
+    from pytest import raises
+    from honeybadgermpc.polynomial import ntt
+    poly = Polynomial([1, GaloisField(2), GaloisField.modulus + 3, 0, 0])
+    assert poly.coeffs == [1, 2, 3]
+    assert all(type(c) is type(GaloisField(0)) for c in poly.coeffs)
+    assert Polynomial([0, 0]).isZero() and Polynomial([]).coeffs == []
+    with raises(AttributeError):
+        poly.degree = 2
+    # Shorter inputs are padded with zeros by the transform
+    omega = get_omega(GaloisField, 8)
+    assert ntt(poly.coeffs, omega, GaloisField, 8) == \
+        ntt(poly.coeffs + [0] * 5, omega, GaloisField)
+    assert poly.evaluate_fft(omega, 8) == [poly(omega**i) for i in range(8)]
@@ -0,0 +1,50 @@
+from pytest import mark, raises
+
+
+def test_preprocessing_store(GaloisField):
+    from honeybadgermpc.preprocessing import PreprocessingStore, NotEnoughPreprocessing
+    store = PreprocessingStore(GaloisField)
+    store.add_randoms(range(10))
+    store.add_zeros([GaloisField(0)] * 3)
+    assert store.available('randoms') == 10 and store.available('triples') == 0
+    assert store.get_randoms(4).to_list() == [0, 1, 2, 3]
+    assert store.get_randoms(4).to_list() == [4, 5, 6, 7]
+    store.add_randoms([-1])
+    assert store.get_randoms(3).to_list() == [8, 9, GaloisField(-1)]
+    assert store.get_zeros(0).to_list() == []
+    with raises(NotEnoughPreprocessing):
+        store.get_randoms(1)
+    with raises(ValueError):
+        store.add_triples([1, 2], [3, 4], [12])
+
+
+@mark.usefixtures('triples_shares_files')
+def test_read_triples(GaloisField, Polynomial, triples_files_prefix):
+    from honeybadgermpc.preprocessing import PreprocessingStore
+    N = 3
+    stores = [PreprocessingStore(GaloisField) for _ in range(N)]
+    for i, store in enumerate(stores):
+        store.read_triples(open(f'{triples_files_prefix}-{i}.share'))
+    assert stores[0].available('triples') == 1000
+    triples = [store.get_triples(5) for store in stores]
+    xs = list(range(1, N+1))
+    a, b, ab = [Polynomial.interpolate_columns(xs, [triple[j] for triple in triples])
+                for j in range(3)]
+    assert a * b == ab
+
+
+def test_deal_preprocessing(GaloisField, Polynomial):
+    from honeybadgermpc.preprocessing import deal_preprocessing
+    N, t = 5, 2
+    stores = deal_preprocessing(GaloisField, N, t, triples=8, randoms=4, zeros=6)
+    xs = list(range(1, N+1))
+    triples = [store.get_triples(8) for store in stores]
+    a, b, ab = [Polynomial.interpolate_columns(xs, [triple[j] for triple in triples])
+                for j in range(3)]
+    assert a * b == ab
+    zeros = [store.get_zeros(6) for store in stores]
+    assert Polynomial.interpolate_columns(xs, zeros).to_list() == [0] * 6
+    # The shares have degree t
+    randoms = [store.get_randoms(4) for store in stores]
+    assert Polynomial.robust_interpolate_columns(xs, randoms, t) == \
+        Polynomial.interpolate_columns(xs[:t+1], randoms[:t+1])